@@ -0,0 +1,178 @@
+# bench.py
+#
+# Benchmarky kritických cest nad syntetickými bankami otázek.
+# Použití: python app/bench.py [--sizes 1000 10000 ...] [--out bench.json]
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from data import (
+    load_questions_from_json,
+    save_session,
+    append_session_event,
+    load_session,
+    load_session_events,
+    save_stats,
+    load_stats,
+)
+from question_bank import QuestionBank
+from quiz_engine import QuizEngine, replay_session, resolve_session
+from storage import JsonStatsStorage, StatsWriter
+from generate_bank import generate_questions, write_bank, generate_stats
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+# Kolik odpovědí se simuluje v benchmarcích "za odpověď"
+ANSWERS = 200
+
+def measure(name, size, fn, repeat=1):
+    """Spustí fn repeat-krát, vrátí nejlepší čas a špičku alokované paměti.
+
+    Paměť se měří zvláštním během, protože tracemalloc výrazně zpomaluje.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"name": name, "size": size, "seconds": round(best, 6), "peak_kib": peak // 1024}
+
+def run_size(size, workdir):
+    results = []
+    bank_file = os.path.join(workdir, f"bank_{size}.json")
+    stats_file = os.path.join(workdir, f"stats_{size}.json")
+    session_file = os.path.join(workdir, f"session_{size}.json")
+    journal_file = os.path.join(workdir, f"session_{size}.journal")
+    write_bank(generate_questions(size), bank_file)
+    save_stats(generate_stats(size, coverage=1.0), stats_file, "none")
+
+    results.append(measure("load_questions_json", size, lambda: load_questions_from_json(bank_file, use_cache=False)))
+    load_questions_from_json(bank_file)
+    results.append(measure("load_questions_cached", size, lambda: load_questions_from_json(bank_file)))
+    questions = load_questions_from_json(bank_file)
+    bank = QuestionBank(questions)
+    results.append(measure("build_question_bank", size, lambda: QuestionBank(questions)))
+
+    engine = QuizEngine(questions, seed=1)
+    session = dict(engine.session_data(), generation="bench")
+    results.append(measure("save_session_snapshot", size, lambda: save_session(session, session_file, journal_file)))
+
+    def answers_with_journal():
+        # Každý běh začíná s prázdným žurnálem, ať časový i paměťový běh dělají totéž
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+        for i in range(ANSWERS):
+            append_session_event({"e": "answered", "g": "bench", "t": i, "correct": i % 3 != 0}, journal_file)
+            append_session_event({"e": "advanced", "g": "bench", "t": i}, journal_file)
+    results.append(measure(f"session_journal_x{ANSWERS}", size, answers_with_journal))
+
+    def resume():
+        data = replay_session(load_session(session_file), load_session_events(journal_file))
+        QuizEngine([], resume_data=resolve_session(data, bank))
+    results.append(measure("resume_session", size, resume))
+
+    def grade_all_wrong():
+        # Nejhorší případ opakovacího kola: každá odpověď je špatně
+        graded = QuizEngine(questions, seed=1)
+        step = "next"
+        while step == "next":
+            graded.answer(0)
+            step = graded.advance()
+    results.append(measure("grade_all_wrong_round", size, grade_all_wrong))
+
+    def stats_full_rewrite():
+        stats = load_stats(stats_file)
+        for i in range(ANSWERS):
+            stat = stats[str(questions[i % size].id)]
+            stat["total"] += 1
+            stat["correct"] += 1
+            save_stats(stats, stats_file, "none")
+    # Původní chování (celý stats.json po každé odpovědi) je na velkých bankách neúnosně pomalé
+    if size <= 10000:
+        results.append(measure(f"save_stats_full_x{ANSWERS}", size, stats_full_rewrite))
+    else:
+        results.append({"name": f"save_stats_full_x{ANSWERS}", "size": size, "skipped": True})
+
+    def stats_buffered():
+        writer = StatsWriter(JsonStatsStorage(stats_file, "none"), flush_every=ANSWERS)
+        for i in range(ANSWERS):
+            writer.record_answer(questions[i % size].id, i % 3 != 0)
+        # close() zapíše zbytek a uvolní uzel, další běh (tracemalloc) tak použije stejný
+        writer.close()
+    results.append(measure(f"stats_writer_x{ANSWERS}", size, stats_buffered))
+
+    def stats_rows():
+        stats = load_stats(stats_file)
+        rows = []
+        for qid, stat in stats.items():
+            q = bank.get(qid)
+            q_text = q.text if q else "??"
+            q_short = (q_text[:65] + "...") if len(q_text) > 65 else q_text
+            percent = 100 * stat["correct"] / stat["total"] if stat["total"] > 0 else 0
+            rows.append((int(qid), q_short, stat["total"], stat["correct"], stat["wrong"], percent))
+        rows.sort()
+        return rows
+    results.append(measure("stats_window_rows", size, stats_rows))
+    results.append(measure_treeview(size, stats_rows()))
+    return results
+
+def measure_treeview(size, rows):
+    """Vložení řádků do Treeview; bez displeje se přeskočí."""
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        return {"name": "stats_treeview_page", "size": size, "skipped": True}
+    from stats_window import STATS_PAGE_SIZE
+    tree = ttk.Treeview(root, columns=("ID", "Otázka", "Celkem", "Správně", "Špatně", "Úspěšnost"), show="headings")
+
+    def fill():
+        tree.delete(*tree.get_children())
+        for row in rows[:STATS_PAGE_SIZE]:
+            tree.insert("", "end", values=row)
+    result = measure("stats_treeview_page", size, fill)
+    root.destroy()
+    return result
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarky načítání, vyhodnocení, ukládání a statistik.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--out", help="soubor pro JSON výsledky (jinak stdout)")
+    args = parser.parse_args(argv)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            print(f"velikost {size}…", file=sys.stderr)
+            report["results"].extend(run_size(size, workdir))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,43 @@
 # data.py
 
+import gc
+import hashlib
 import json
 import os
+import pickle
+import random
+
+from question import Question
 
 SESSION_FILE = "last_session.json"
+SESSION_JOURNAL_FILE = "last_session.journal"
 STATS_FILE = "stats.json"
+STATS_DB_FILE = "stats.sqlite3"
+HISTORY_FILE = "attempts.bin"
+SCHEDULE_FILE = "schedule.json"
+SERVER_DB_FILE = "server.sqlite3"
+SESSION_VERSION = 2
+# Zkompilovaná cache banky otázek (soubor vedle banky s touto příponou)
+QUESTION_CACHE_SUFFIX = ".cache"
+SEARCH_CACHE_SUFFIX = ".index.cache"
+QUESTION_CACHE_VERSION = 3
+
+# Úložiště statistik: "json" (stats.json) nebo "sqlite" (stats.sqlite3)
+STATS_BACKEND = os.environ.get("QUIZ_STATS_BACKEND", "json")
+# Zápis statistik: po kolika odpovědích / milisekundách se buffer zapíše na disk
+STATS_FLUSH_EVERY = 20
+STATS_FLUSH_MS = 5000
+# Jak často (ms) Tk vlákno vyzvedává výsledky z I/O vlákna na pozadí
+IO_POLL_MS = 50
+# "none" = bez fsync, "file" = fsync souboru, "full" = fsync souboru i adresáře
+STATS_DURABILITY = "file"
+# stats.json v2: čítače po instancích (G-counter), viz load_stats_document
+STATS_VERSION = 2
+LEGACY_NODE_PREFIX = "legacy-"
+# Jak dlouho (s) čekat na zámek stats.json, než se zápis odloží na příště
+STATS_LOCK_TIMEOUT = 2.0
+# Trvalé ID zařízení (sdílí ho všechny instance aplikace na jednom počítači)
+DEVICE_ID_FILE = os.environ.get("QUIZ_DEVICE_ID_FILE", os.path.join(os.path.expanduser("~"), ".quiz_device_id"))
 
 def make_json_serializable(obj):
     """Rekurzivně převádí všechny sety na listy v dictu/listu."""
@@ -17,39 +50,371 @@ def make_json_serializable(obj):
     else:
         return obj
 
-def load_questions_from_json(filename):
+def _iter_json_array(f, chunk_size=1 << 16):
+    """Postupně dekóduje prvky JSON pole ze souboru, bez načtení celého souboru."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    # "[" -> prvek nebo "]", prvek -> "," nebo "]", "," -> prvek
+    expect = "["
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Neočekávaný konec JSON pole")
+            fill()
+            continue
+        char = buf[pos]
+        if expect == "[":
+            if char != "[":
+                raise ValueError("Banka otázek musí být JSON pole")
+            expect = "first"
+            pos += 1
+            continue
+        if char == "]" and expect in ("first", "separator"):
+            return
+        if expect == "separator":
+            if char != ",":
+                raise ValueError(f"Očekávána čárka mezi prvky JSON pole, nalezeno {char!r}")
+            expect = "value"
+            pos += 1
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if not eof and (end == len(buf) or buf[end] not in " \t\r\n,]"):
+            # Hodnota končí na konci bloku nebo ji neukončuje oddělovač – číslo
+            # ("-1" z "-1.5e3") může pokračovat v dalším bloku
+            fill()
+            continue
+        pos = end
+        expect = "separator"
+        yield obj
+
+def iter_questions(filename):
+    """Generátor otázek (Question) z banky – JSON pole (.json) nebo JSON Lines (.jsonl), jedna po druhé."""
+    with open(filename, "r", encoding="utf-8") as f:
+        if filename.endswith(".jsonl"):
+            source = (json.loads(line) for line in f if line.strip())
+        else:
+            source = _iter_json_array(f)
+        for obj in source:
+            yield Question.from_json(obj)
+
+def _file_sha256(filename, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _read_cache(cache_file):
+    """Vrací (hlavička, obsah) z cache souboru, nebo (None, None)."""
+    try:
+        f = open(cache_file, "rb")
+    except OSError:
+        return None, None
+    with f:
+        try:
+            header = pickle.load(f)
+            if header.get("version") != QUESTION_CACHE_VERSION:
+                return None, None
+            payload = pickle.load(f)
+        except Exception:
+            return None, None
+    return header, payload
+
+def _write_cache(cache_file, header, payload):
+    tmp = cache_file + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except OSError:
+        # Cache je jen zrychlení, nezapisovatelný adresář nevadí
+        pass
+
+def load_cached(filename, suffix, build):
+    """Vrátí data odvozená z banky filename; z cache <filename><suffix>, nebo zavolá build().
+
+    Cache je platná, když sedí cesta, mtime a velikost banky, případně (po
+    pouhém touch/kopii) SHA-256 obsahu. Jinak se data sestaví znovu a cache
+    se přegeneruje.
+    """
+    st = os.stat(filename)
+    cache_file = filename + suffix
+    header = {
+        "version": QUESTION_CACHE_VERSION,
+        "path": os.path.abspath(filename),
+        "mtime": st.st_mtime_ns,
+        "size": st.st_size,
+    }
+    cached_header, cached = _read_cache(cache_file)
+    if cached_header is not None and all(cached_header.get(k) == v for k, v in header.items()):
+        return cached
+    header["hash"] = _file_sha256(filename)
+    if cached_header is not None and cached_header.get("hash") == header["hash"]:
+        payload = cached
+    else:
+        payload = build()
+    _write_cache(cache_file, header, payload)
+    return payload
+
+def load_questions_from_json(filename, use_cache=True):
+    """Načte banku otázek; pokud se banka nezměnila, vezme hotové otázky z cache."""
     if not os.path.exists(filename):
         return []
-    with open(filename, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-        for q in raw:
-            q["answer"] = set(q["answer"])
+    # Statisíce nových objektů bez cyklů: cyklický GC by je při načítání
+    # opakovaně procházel, takže se na tu dobu vypne
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if not use_cache:
+            return list(iter_questions(filename))
+        return load_cached(filename, QUESTION_CACHE_SUFFIX, lambda: list(iter_questions(filename)))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def atomic_write_json(obj, filename, durability="none"):
+    """Zapíše JSON do dočasného souboru a přejmenuje ho, takže pád nikdy nezanechá useknutý soubor."""
+    tmp = filename + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+        if durability != "none":
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, filename)
+    if durability == "full" and hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def load_stats_document(filename=STATS_FILE):
+    """Načte stats.json jako dokument v2.
+
+    {"version": 2, "resets": {zařízení: čas}, "node_since": {uzel: čas},
+     "counters": {uzel: {ID: [total, correct, wrong]}}, "values": {...},
+     "values_ts": {...}}. Každá instance zapisuje jen do svého uzlu
+    (<zařízení>-<n>). Reset statistik zvýší čas v "resets" jen pro své
+    zařízení; uzly toho zařízení se starším node_since tím přestanou platit.
+    Starý plochý formát se převede do uzlu "legacy-<hash obsahu>".
+    """
+    raw = {}
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    return stats_document(raw)
+
+def node_device(node):
+    """Zařízení, kterému uzel patří ("<zařízení>-<n>"); legacy uzel je sám sobě zařízením."""
+    if node.startswith(LEGACY_NODE_PREFIX):
+        return node
+    return node.rsplit("-", 1)[0]
+
+def stats_document(raw):
+    """Převede obsah stats.json (v2 nebo plochý v1) na úplný dokument v2.
+
+    Uzel se starými plochými čítači se jmenuje podle hashe obsahu: kopie
+    stejného souboru na více zařízeních tak po sloučení splynou (maximum
+    po složkách) a nesečtou se, různé soubory zůstanou oddělené.
+    """
+    if raw.get("version") == STATS_VERSION and "counters" in raw:
+        raw.setdefault("resets", {})
+        raw.setdefault("node_since", {})
+        raw.setdefault("values", {})
+        raw.setdefault("values_ts", {})
         return raw
+    legacy = {}
+    values = {}
+    for key, value in raw.items():
+        if isinstance(value, dict):
+            legacy[key] = [value["total"], value["correct"], value["wrong"]]
+        else:
+            values[key] = value
+    canonical = json.dumps(raw, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    node = LEGACY_NODE_PREFIX + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+    return {
+        "version": STATS_VERSION,
+        "resets": {},
+        "node_since": {node: 0} if legacy else {},
+        "counters": {node: legacy} if legacy else {},
+        "values": values,
+        "values_ts": {key: 0 for key in values},
+    }
+
+def max_counters(a, b):
+    """Po složkách maximum dvou uzlů G-counteru ({ID: [total, correct, wrong]})."""
+    merged = dict(a)
+    for str_id, counts in b.items():
+        current = merged.get(str_id)
+        merged[str_id] = counts if current is None else [max(x, y) for x, y in zip(current, counts)]
+    return merged
+
+def merge_stats_documents(a, b):
+    """Sloučí dva dokumenty v2; výsledek nezávisí na pořadí a opakované sloučení nic nezmění.
+
+    Časy resetů se slučují maximem po zařízeních. Uzel platí, jen pokud
+    vznikl po posledním resetu svého zařízení, takže reset na jednom zařízení
+    nesmaže uzly ostatních. Stejný uzel ze dvou dokumentů: novější node_since
+    vyhrává, při shodě se čítače sloučí maximem po složkách (každý uzel roste
+    jen na svém zařízení). Hodnoty jako latest_duration se řídí časem zápisu
+    (poslední vyhrává).
+    """
+    resets = dict(a["resets"])
+    for device, reset_at in b["resets"].items():
+        resets[device] = max(resets.get(device, 0), reset_at)
+    counters = {}
+    node_since = {}
+    for doc in (a, b):
+        for node, slot in doc["counters"].items():
+            since = doc["node_since"].get(node, 0)
+            if since < resets.get(node_device(node), 0):
+                continue
+            current = node_since.get(node)
+            if current is None or since > current:
+                counters[node] = slot
+                node_since[node] = since
+            elif since == current:
+                counters[node] = max_counters(counters[node], slot)
+    values = dict(a["values"])
+    values_ts = dict(a["values_ts"])
+    for key, value in b["values"].items():
+        ts = b["values_ts"].get(key, 0)
+        if key not in values or (ts, json.dumps(value)) > (values_ts.get(key, 0), json.dumps(values[key])):
+            values[key] = value
+            values_ts[key] = ts
+    return {
+        "version": STATS_VERSION,
+        "resets": resets,
+        "node_since": node_since,
+        "counters": counters,
+        "values": values,
+        "values_ts": values_ts,
+    }
+
+def flatten_stats(doc):
+    """Sečte čítače platných uzlů do plochého formátu {ID: {total, correct, wrong}}."""
+    stats = {}
+    resets = doc.get("resets", {})
+    node_since = doc.get("node_since", {})
+    for node, counters in doc["counters"].items():
+        if node_since.get(node, 0) < resets.get(node_device(node), 0):
+            continue
+        for str_id, (total, correct, wrong) in counters.items():
+            stat = stats.get(str_id)
+            if stat is None:
+                stats[str_id] = {"total": total, "correct": correct, "wrong": wrong}
+            else:
+                stat["total"] += total
+                stat["correct"] += correct
+                stat["wrong"] += wrong
+    stats.update(doc["values"])
+    return stats
 
 def load_stats(filename=STATS_FILE):
-    if os.path.exists(filename):
+    """Ploché statistiky; stats.json v2 se sečte přes všechny uzly (viz load_stats_document)."""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if raw.get("version") == STATS_VERSION and "counters" in raw:
+        return flatten_stats(raw)
+    return raw
+
+def device_id(filename=DEVICE_ID_FILE):
+    """Trvalé náhodné ID tohoto zařízení; při prvním volání se vytvoří."""
+    try:
         with open(filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+            value = f.read().strip()
+        if value:
+            return value
+    except OSError:
+        pass
+    value = "%012x" % random.getrandbits(48)
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(value)
+    except OSError:
+        pass
+    return value
 
-def save_stats(stats, filename=STATS_FILE):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(stats, f, indent=2, ensure_ascii=False)
+def save_stats(stats, filename=STATS_FILE, durability=STATS_DURABILITY):
+    atomic_write_json(stats, filename, durability)
+
+def save_session(data, filename=SESSION_FILE, journal=SESSION_JOURNAL_FILE):
+    """Uloží kompletní snapshot session a zahodí žurnál, který už je v něm obsažen."""
+    atomic_write_json(make_json_serializable(data), filename)
+    if os.path.exists(journal):
+        os.remove(journal)
+
+def append_session_event(event, journal=SESSION_JOURNAL_FILE):
+    """Připíše jednu událost (jeden JSON řádek) na konec žurnálu session."""
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+def load_session_events(journal=SESSION_JOURNAL_FILE):
+    """Načte události ze žurnálu. Useknutý poslední řádek (pád při zápisu) se ignoruje."""
+    if not os.path.exists(journal):
+        return []
+    events = []
+    with open(journal, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+    return events
 
-def save_session(data, filename=SESSION_FILE):
-    data = make_json_serializable(data)
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def migrate_session(data):
+    """Převede starý formát session (celé otázky) na verzi 2 (pouze ID otázek)."""
+    if data.get("version") == SESSION_VERSION:
+        return data
+    def ids(q_list):
+        return [q["id"] for q in q_list if q.get("id") is not None]
+    return {
+        "version": SESSION_VERSION,
+        "generation": data.get("generation"),
+        "seed": random.getrandbits(32),
+        "all_ids": ids(data.get("all_questions", [])),
+        "question_ids": ids(data.get("question_list", [])),
+        "wrong_ids": ids(data.get("wrong_questions", [])),
+        "question_index": data.get("question_index", 0),
+        "kolo": data.get("kolo", 1),
+        "mode": data.get("mode", "first_run"),
+        "score": data.get("score", 0),
+        "elapsed_seconds": data.get("elapsed_seconds", 0),
+    }
 
 def load_session(filename=SESSION_FILE):
     if not os.path.exists(filename):
         return None
     with open(filename, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return migrate_session(json.load(f))
 
-def clear_session(filename=SESSION_FILE):
+def clear_session(filename=SESSION_FILE, journal=SESSION_JOURNAL_FILE):
     if os.path.exists(filename):
         os.remove(filename)
+    if os.path.exists(journal):
+        os.remove(journal)
 
 def session_exists(filename=SESSION_FILE):
     """Vrací True pokud existuje session soubor."""
@@ -0,0 +1,210 @@
+# dedupe.py
+#
+# Hledání téměř duplicitních otázek (MinHash + LSH) ve sloučené bance.
+# Použití: python app/dedupe.py merged_questions.json [--threshold 0.8]
+#          [--report dupes.json] [--dedup-out deduped.json] [--remap-out remap.json]
+#          [--stats stats.json --stats-out stats_remapped.json] [--merge-conflicting]
+
+import argparse
+import hashlib
+import json
+import struct
+import sys
+
+from data import iter_questions, load_stats, atomic_write_json
+from search import tokenize
+from generate_bank import write_bank
+
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+_UNPACK = struct.Struct(f"<{NUM_PERM}I").unpack
+
+def shingles(q):
+    """Množina slovních n-gramů z normalizovaného textu otázky a (seřazených) možností."""
+    words = tokenize(q.text)
+    words += tokenize(" ".join(sorted(str(v) for v in q.option_texts)))
+    if len(words) < SHINGLE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+
+def minhash(shingle_set):
+    """MinHash podpis: jedno volání shake_128 na shingle dá všech NUM_PERM hashů najednou."""
+    rows = [_UNPACK(hashlib.shake_128(s.encode("utf-8")).digest(4 * NUM_PERM)) for s in shingle_set]
+    return tuple(map(min, zip(*rows)))
+
+def similarity(sig_a, sig_b):
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+def _char_shingles(text):
+    if len(text) < SHINGLE:
+        return {text}
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def answers_differ(keep, member):
+    """Porovná správné odpovědi dvou podobných otázek ((normalizované možnosti, maska)).
+
+    Stejné texty správných možností (bez ohledu na diakritiku, velikost písmen,
+    bílé znaky a pořadí) se shodují hned. Jinak se každá možnost duplicity
+    přiřadí nejpodobnější možnosti ponechané otázky (znakové n-gramy), takže
+    přeformulovaná "MD 311 / D 604" odpovídá "Má dáti 311, Dal 604". Odpovědi
+    se liší, pokud přiřazené správné možnosti nejsou právě ty správné.
+    """
+    keep_options, keep_mask = keep
+    member_options, member_mask = member
+    keep_correct = {i for i in range(len(keep_options)) if keep_mask >> i & 1}
+    member_correct = {i for i in range(len(member_options)) if member_mask >> i & 1}
+    if sorted(keep_options[i] for i in keep_correct) == sorted(member_options[i] for i in member_correct):
+        return False
+    keep_shingles = [_char_shingles(text) for text in keep_options]
+    mapped = set()
+    for i, text in enumerate(member_options):
+        shingles_i = _char_shingles(text)
+        scores = [_jaccard(shingles_i, other) for other in keep_shingles]
+        best = max(scores)
+        if best == 0 or scores.count(best) > 1:
+            # Možnost nejde jednoznačně přiřadit – radši se nahlásí jako konflikt
+            return True
+        j = scores.index(best)
+        if (i in member_correct) != (j in keep_correct):
+            return True
+        if i in member_correct:
+            mapped.add(j)
+    return mapped != keep_correct
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Ponechá se nižší ID (starší otázka)
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+def find_duplicates(questions, threshold=0.8):
+    """Vrátí seznam clusterů [{keep, members: [{id, similarity, answers_differ}]}].
+
+    Otázky se zpracují v jednom průchodu (stačí generátor); v paměti zůstávají
+    jen podpisy, normalizované možnosti s maskou odpovědi a LSH buckety, takže
+    čas je téměř lineární.
+    """
+    signatures = {}
+    answers = {}
+    buckets = {}
+    uf = _UnionFind()
+    pair_scores = {}
+    for q in questions:
+        qid = q.id
+        sig = minhash(shingles(q))
+        signatures[qid] = sig
+        answers[qid] = (tuple(" ".join(tokenize(str(text))) for text in q.option_texts), q.answer_mask)
+        for band in range(BANDS):
+            key = (band, sig[band * ROWS:(band + 1) * ROWS])
+            bucket = buckets.setdefault(key, [])
+            for other in bucket:
+                if (other, qid) in pair_scores:
+                    continue
+                score = similarity(sig, signatures[other])
+                pair_scores[(other, qid)] = score
+                if score >= threshold:
+                    uf.union(other, qid)
+            bucket.append(qid)
+    clusters = {}
+    for qid in signatures:
+        root = uf.find(qid)
+        if root != qid:
+            clusters.setdefault(root, []).append(qid)
+    result = []
+    for keep, members in sorted(clusters.items()):
+        result.append({
+            "keep": keep,
+            "members": [
+                {
+                    "id": member,
+                    "similarity": round(similarity(signatures[keep], signatures[member]), 3),
+                    "answers_differ": answers_differ(answers[keep], answers[member]),
+                }
+                for member in sorted(members)
+            ],
+        })
+    return result
+
+def build_remap(clusters, merge_conflicting=False):
+    """Mapování {duplicitní ID: ponechané ID}.
+
+    Členové s jinou správnou odpovědí (answers_differ) jsou jiné otázky s
+    podobným zněním – bez merge_conflicting se jen nahlásí a zůstanou.
+    """
+    return {
+        str(member["id"]): cluster["keep"]
+        for cluster in clusters
+        for member in cluster["members"]
+        if merge_conflicting or not member["answers_differ"]
+    }
+
+def remap_stats(stats, remap):
+    """Sečte čítače duplicit do ponechané otázky."""
+    merged = {}
+    for key, value in stats.items():
+        if not isinstance(value, dict):
+            merged[key] = value
+            continue
+        target = str(remap.get(key, key))
+        stat = merged.setdefault(target, {"total": 0, "correct": 0, "wrong": 0})
+        for field in ("total", "correct", "wrong"):
+            stat[field] += value[field]
+    return merged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Najde téměř duplicitní otázky v bance (MinHash/LSH).")
+    parser.add_argument("bank")
+    parser.add_argument("--threshold", type=float, default=0.8, help="minimální odhadnutá Jaccardova podobnost")
+    parser.add_argument("--report", help="soubor pro JSON report (jinak stdout)")
+    parser.add_argument("--dedup-out", help="zapsat banku bez duplicit")
+    parser.add_argument("--remap-out", help="zapsat mapování {duplicitní ID: ponechané ID}")
+    parser.add_argument("--stats", help="stats.json k přečíslování")
+    parser.add_argument("--stats-out", help="výstup přečíslovaných statistik")
+    parser.add_argument("--merge-conflicting", action="store_true",
+                        help="sloučit i podobné otázky s jinou správnou odpovědí (jinak se jen nahlásí)")
+    args = parser.parse_args(argv)
+
+    clusters = find_duplicates(iter_questions(args.bank), args.threshold)
+    remap = build_remap(clusters, args.merge_conflicting)
+    conflicting = sum(m["answers_differ"] for c in clusters for m in c["members"])
+    report = json.dumps({"threshold": args.threshold, "clusters": clusters}, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+    print(f"Clusterů: {len(clusters)}, duplicit: {len(remap)}, s jinou odpovědí: {conflicting}", file=sys.stderr)
+
+    if args.dedup_out:
+        def kept():
+            for q in iter_questions(args.bank):
+                if str(q.id) not in remap:
+                    yield q.to_json()
+        write_bank(kept(), args.dedup_out)
+    if args.remap_out:
+        atomic_write_json(remap, args.remap_out)
+    if args.stats and args.stats_out:
+        atomic_write_json(remap_stats(load_stats(args.stats), remap), args.stats_out)
+
+if __name__ == "__main__":
+    main()
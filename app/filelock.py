@@ -0,0 +1,75 @@
+# filelock.py
+
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def _try_lock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+class FileLock:
+    """Advisory zámek nad pomocným souborem (flock, na Windows msvcrt.locking).
+
+    Zámek drží otevřený deskriptor, takže ho systém uvolní i při pádu procesu
+    a nikdy nezůstane viset. Dvě instance ve stejném procesu se také vylučují.
+    """
+    def __init__(self, path, timeout=None, poll=0.02):
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fd = None
+
+    @property
+    def locked(self):
+        return self._fd is not None
+
+    def acquire(self, blocking=True):
+        """Vrací True po získání zámku; False, pokud vypršel timeout (nebo blocking=False)."""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                _try_lock(fd)
+            except OSError:
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    os.close(fd)
+                    return False
+                time.sleep(self.poll)
+            else:
+                self._fd = fd
+                return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Soubor {self.path} je zamčený jinou instancí programu.")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,129 @@
+# generate_bank.py
+#
+# Deterministický generátor syntetických bank otázek, stats.json a
+# last_session.json pro testy výkonu.
+# Použití: python app/generate_bank.py --size 100000 --seed 1 --out-dir /tmp/bank
+
+import argparse
+import json
+import os
+import random
+import string
+
+from data import SESSION_VERSION, atomic_write_json
+
+WORDS = (
+    "aktiva", "pasiva", "vlastní", "cizí", "kapitál", "zisk", "ztráta", "náklady",
+    "výnosy", "odpisy", "rozvaha", "výsledovka", "závazky", "pohledávky", "zásoby",
+    "daň", "úvěr", "úrok", "hotovost", "likvidita", "rentabilita", "majetek",
+)
+
+def _text(rng, length):
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize()
+
+def generate_questions(size, seed=0, min_options=2, max_options=5, multi_ratio=0.2,
+                       text_length=80, practical_ratio=0.3, table_ratio=0.05, explanation_ratio=0.3):
+    """Generátor otázek ve formátu merged_questions.json (answer jako seznam)."""
+    rng = random.Random(seed)
+    for qid in range(1, size + 1):
+        keys = string.ascii_lowercase[:rng.randint(min_options, max_options)]
+        if len(keys) > 1 and rng.random() < multi_ratio:
+            answer = sorted(rng.sample(keys, rng.randint(2, len(keys))))
+        else:
+            answer = [rng.choice(keys)]
+        q = {
+            "id": qid,
+            "type": "practical" if rng.random() < practical_ratio else "theoretical",
+            "question": _text(rng, text_length) + "?",
+            "options": {k: _text(rng, max(10, text_length // 3)) for k in keys},
+            "answer": answer,
+        }
+        if rng.random() < table_ratio:
+            cols = rng.randint(2, 4)
+            q["table"] = {
+                "header": [rng.choice(WORDS) for _ in range(cols)],
+                "rows": [[rng.randint(0, 100000) for _ in range(cols)] for _ in range(rng.randint(1, 5))],
+            }
+        if rng.random() < explanation_ratio:
+            q["explanation"] = _text(rng, text_length)
+        yield q
+
+def write_bank(questions, filename):
+    """Zapíše otázky průběžně – JSON pole, nebo JSON Lines pro příponu .jsonl."""
+    with open(filename, "w", encoding="utf-8") as f:
+        if filename.endswith(".jsonl"):
+            for q in questions:
+                f.write(json.dumps(q, ensure_ascii=False) + "\n")
+            return
+        f.write("[\n")
+        for idx, q in enumerate(questions):
+            if idx:
+                f.write(",\n")
+            f.write(json.dumps(q, ensure_ascii=False))
+        f.write("\n]\n")
+
+def generate_stats(size, seed=0, coverage=0.8, max_attempts=30):
+    """Statistiky pro ID 1..size; coverage je podíl otázek, které už byly zodpovězené."""
+    rng = random.Random(seed + 1)
+    stats = {}
+    for qid in range(1, size + 1):
+        if rng.random() < coverage:
+            total = rng.randint(1, max_attempts)
+            correct = rng.randint(0, total)
+            stats[str(qid)] = {"total": total, "correct": correct, "wrong": total - correct}
+    return stats
+
+def generate_session(size, seed=0, session_size=None):
+    """Rozpracovaná session (schéma v2) nad ID 1..size."""
+    rng = random.Random(seed + 2)
+    session_size = min(size, session_size or size)
+    all_ids = rng.sample(range(1, size + 1), session_size)
+    question_ids = all_ids.copy()
+    rng.shuffle(question_ids)
+    question_index = rng.randrange(session_size) if session_size else 0
+    wrong_ids = [qid for qid in question_ids[:question_index] if rng.random() < 0.3]
+    return {
+        "version": SESSION_VERSION,
+        "generation": f"synthetic-{seed}",
+        "seed": rng.getrandbits(32),
+        "all_ids": all_ids,
+        "question_ids": question_ids,
+        "wrong_ids": wrong_ids,
+        "question_index": question_index,
+        "kolo": 1,
+        "mode": "first_run",
+        "score": question_index - len(wrong_ids),
+        "elapsed_seconds": question_index * rng.randint(5, 40),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generátor syntetických bank otázek a statistik.")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-options", type=int, default=2)
+    parser.add_argument("--max-options", type=int, default=5)
+    parser.add_argument("--multi-ratio", type=float, default=0.2, help="podíl otázek s více správnými odpověďmi")
+    parser.add_argument("--text-length", type=int, default=80, help="přibližná délka textu otázky ve znacích")
+    parser.add_argument("--stats-coverage", type=float, default=0.8)
+    parser.add_argument("--session-size", type=int, help="počet otázek v rozpracované session (jinak celá banka)")
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    bank_file = os.path.join(args.out_dir, f"merged_questions.{args.format}")
+    write_bank(generate_questions(
+        args.size, args.seed, args.min_options, args.max_options, args.multi_ratio, args.text_length
+    ), bank_file)
+    atomic_write_json(generate_stats(args.size, args.seed, args.stats_coverage), os.path.join(args.out_dir, "stats.json"))
+    atomic_write_json(generate_session(args.size, args.seed, args.session_size), os.path.join(args.out_dir, "last_session.json"))
+    print(f"Vygenerováno {args.size} otázek do {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
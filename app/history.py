@@ -0,0 +1,88 @@
+# history.py
+
+import mmap
+import os
+import struct
+import time
+
+from data import HISTORY_FILE
+
+# Jeden pokus = pevný záznam 20 B: čas (unix), ID otázky, doba odpovědi (s), kolo, správně
+RECORD = struct.Struct("<dIfHBx")
+
+class AttemptLog:
+    """Append-only binární log všech odpovědí.
+
+    Záznamy mají pevnou délku a jsou seřazené podle času zápisu, takže se
+    soubor dá namapovat do paměti a začátek intervalu najít půlením.
+    """
+    def __init__(self, filename=HISTORY_FILE):
+        self.filename = filename
+
+    def append(self, attempts):
+        """Připíše pokusy ve tvaru (ts, question_id, correct, duration, kolo)."""
+        if not attempts:
+            return
+        payload = b"".join(
+            RECORD.pack(ts, int(qid), float(duration), kolo, 1 if correct else 0)
+            for ts, qid, correct, duration, kolo in attempts
+        )
+        with open(self.filename, "ab") as f:
+            # Po pádu uprostřed zápisu zarovná soubor zpět na celé záznamy
+            size = f.seek(0, os.SEEK_END)
+            if size % RECORD.size:
+                f.truncate(size - size % RECORD.size)
+            f.write(payload)
+
+    def _open_map(self):
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) < RECORD.size:
+            return None
+        with open(self.filename, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _first_index_since(self, mm, count, since):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if RECORD.unpack_from(mm, mid * RECORD.size)[0] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def iter_records(self, since=None):
+        """Vrací záznamy (ts, question_id, duration, kolo, correct), volitelně jen od času since."""
+        mm = self._open_map()
+        if mm is None:
+            return
+        with mm:
+            # Useknutý poslední záznam (pád při zápisu) se ignoruje
+            count = len(mm) // RECORD.size
+            start = self._first_index_since(mm, count, since) if since is not None else 0
+            view = memoryview(mm)[start * RECORD.size:count * RECORD.size]
+            try:
+                yield from RECORD.iter_unpack(view)
+            finally:
+                view.release()
+
+    def accuracy_since(self, since):
+        """Vrací (počet pokusů, počet správných) od času since."""
+        total = correct = 0
+        for record in self.iter_records(since):
+            total += 1
+            correct += record[4]
+        return total, correct
+
+    def last_seen_since(self, since):
+        """Vrací {str(question_id): čas posledního pokusu} pro pokusy od času since."""
+        last = {}
+        for ts, qid, _, _, _ in self.iter_records(since):
+            last[str(qid)] = ts
+        return last
+
+    def accuracy_last_days(self, days):
+        return self.accuracy_since(time.time() - days * 86400)
+
+    def clear(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
@@ -0,0 +1,175 @@
+# io_worker.py
+
+import queue
+import sys
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future
+
+from data import IO_POLL_MS
+
+class _Task:
+    __slots__ = ("fn", "args", "key", "callback", "error", "future", "cancelled")
+
+    def __init__(self, fn, args, key, callback, error, future):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.callback = callback
+        self.error = error
+        self.future = future
+        self.cancelled = False
+
+def _report(exc):
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+class IOWorker:
+    """Jediné vlákno na pozadí, které vlastní veškerou práci s diskem.
+
+    Úlohy běží v pořadí odeslání. Úloha s klíčem (key) nahradí dosud
+    nezačatou úlohu se stejným klíčem – z několika uložení session po sobě se
+    tak zapíše jen poslední. Výsledky a chyby se do Tk vlákna vrací přes
+    root.after (viz attach); bez Tk se callbacky volají přímo ve vlákně workeru.
+    """
+    def __init__(self, poll_ms=IO_POLL_MS):
+        self.poll_ms = poll_ms
+        self._tasks = deque()
+        self._keys = {}
+        self._running = False
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._results = queue.SimpleQueue()
+        self._thread = None
+        self._root = None
+        self._after_id = None
+
+    def attach(self, root):
+        """Napojí worker na Tk smyčku, ve které se budou volat callbacky."""
+        self._root = root
+
+    def _on_worker(self):
+        return threading.current_thread() is self._thread
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="io-worker", daemon=True)
+            self._thread.start()
+
+    def submit(self, fn, *args, key=None, callback=None, error=None):
+        """Zařadí fn(*args) do fronty; callback(výsledek) / error(výjimka) se zavolají v Tk vlákně."""
+        return self._enqueue(fn, args, key, callback, error, None)
+
+    def call(self, fn, *args):
+        """Provede fn(*args) ve workeru až po všech dřívějších úlohách a počká na výsledek."""
+        if self._on_worker():
+            return fn(*args)
+        future = Future()
+        self._enqueue(fn, args, None, None, None, future)
+        return future.result()
+
+    def _enqueue(self, fn, args, key, callback, error, future):
+        task = _Task(fn, args, key, callback, error, future)
+        with self._cond:
+            if key is not None:
+                previous = self._keys.get(key)
+                if previous is not None:
+                    previous.cancelled = True
+                self._keys[key] = task
+            self._tasks.append(task)
+            self._start()
+            self._cond.notify_all()
+        self._schedule_poll()
+        return task
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._tasks and not self._stopping:
+                    self._cond.wait()
+                if not self._tasks:
+                    return
+                task = self._tasks.popleft()
+                if task.key is not None and self._keys.get(task.key) is task:
+                    del self._keys[task.key]
+                self._running = True
+            if not task.cancelled:
+                self._execute(task)
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def _execute(self, task):
+        try:
+            result = task.fn(*task.args)
+        except Exception as e:
+            if task.future is not None:
+                task.future.set_exception(e)
+            else:
+                self._deliver(task.error or _report, e)
+            return
+        if task.future is not None:
+            task.future.set_result(result)
+        elif task.callback is not None:
+            self._deliver(task.callback, result)
+
+    def _deliver(self, fn, value):
+        if self._root is None:
+            fn(value)
+        else:
+            self._results.put((fn, value))
+
+    def _schedule_poll(self):
+        if self._root is not None and self._after_id is None and not self._on_worker():
+            self._after_id = self._root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        self._drain()
+        with self._cond:
+            busy = bool(self._tasks) or self._running
+        if busy or not self._results.empty():
+            self._schedule_poll()
+
+    def _drain(self, callbacks=True):
+        while True:
+            try:
+                fn, value = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if callbacks or isinstance(value, BaseException):
+                fn(value)
+
+    def flush(self):
+        """Počká, až se provedou všechny zařazené úlohy (návrat do menu, ukončení)."""
+        if self._on_worker():
+            return
+        with self._cond:
+            while self._tasks or self._running:
+                self._cond.wait()
+
+    def close(self):
+        """Dokončí frontu a ukončí vlákno; čekající callbacky se už nevolají, chyby se vypíší."""
+        self.flush()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self._after_id is not None and self._root is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._drain(callbacks=False)
+
+_io_worker = None
+
+def get_io_worker():
+    """Vrací sdílený IOWorker (jeden na proces)."""
+    global _io_worker
+    if _io_worker is None:
+        _io_worker = IOWorker()
+    return _io_worker
@@ -1,32 +1,59 @@
 import tkinter as tk
+import os
 import random
 from tkinter import messagebox
 from data import (
     load_questions_from_json,
     session_exists,
-    load_stats,
-    save_stats,
 )
+from storage import get_stats_writer
+from io_worker import get_io_worker
+from question_bank import QuestionBank
+from search import load_search_index
+from sampling import WeightedSampler, weak_spot_weights, RECENCY_DAYS
 from stats_window import show_stats_window
-from quiz_app import start_quiz, continue_last_test
+from quiz_app import start_quiz, continue_last_test, screen_widgets, screen_unchanged
 
-ALL_QUESTIONS = load_questions_from_json("merged_questions.json")
-if not ALL_QUESTIONS:
+# Banka otázek: JSON pole nebo JSON Lines (.jsonl)
+QUESTIONS_FILE = os.environ.get("QUIZ_QUESTIONS_FILE", "merged_questions.json")
+
+_questions = load_questions_from_json(QUESTIONS_FILE)
+if not _questions:
     exit("Nebyl nalezen platný JSON se zadáním otázek!")
+BANK = QuestionBank(_questions, load_search_index(QUESTIONS_FILE, _questions))
+ALL_QUESTIONS = BANK.questions
+
+_weak_spot_cache = {}
+
+def request_weak_spot_sampler(questions, callback):
+    """Sampler pro "slabá místa" předá do callback(sampler); statistiky a historie
+    se čtou v I/O vlákně a alias tabulka se přestaví jen po změně statistik."""
+    key = (id(questions), stats_writer.version)
+    if _weak_spot_cache.get("key") == key:
+        callback(_weak_spot_cache["sampler"])
+        return
+
+    def build(stats, last_seen):
+        sampler = WeightedSampler(questions, weak_spot_weights(questions, stats, last_seen))
+        _weak_spot_cache["key"] = key
+        _weak_spot_cache["sampler"] = sampler
+        callback(sampler)
+
+    stats_writer.request_weak_spot_data(build, RECENCY_DAYS)
 
 def show_main_menu():
     for widget in root.winfo_children():
         widget.destroy()
 
     root.title("Testovací program")
-    root.geometry("720x520")
+    root.geometry("720x700")
     root.resizable(False, False)
 
-    theoretical = [q for q in ALL_QUESTIONS if q.get("type") == "theoretical"]
-    practical = [q for q in ALL_QUESTIONS if q.get("type") == "practical"]
+    theoretical = BANK.of_type("theoretical")
+    practical = BANK.of_type("practical")
     theoretical_count = len(theoretical)
     practical_count = len(practical)
-    all_count = len(ALL_QUESTIONS)
+    all_count = len(BANK)
 
     label = tk.Label(root, text="Vyber si, jaký test chceš spustit:", font=("Arial", 16))
     label.pack(pady=30)
@@ -62,6 +89,20 @@ def show_main_menu():
             questions = random.sample(questions, count)
         start_quiz(root, questions, show_main_menu)
 
+    def start_weak_spots(questions):
+        # Losuje podle chybovosti a doby od posledního pokusu (alias tabulka)
+        count = get_count(len(questions))
+        if count is None or len(questions) == 0:
+            return
+        widgets = screen_widgets(root)
+
+        def open_quiz(sampler):
+            # Mezitím mohl uživatel z menu odejít jinam
+            if screen_unchanged(widgets):
+                start_quiz(root, sampler.sample(count), show_main_menu)
+
+        request_weak_spot_sampler(questions, open_quiz)
+
     def start_view(questions):
         count = get_count(len(questions))
         if count is None or len(questions) == 0:
@@ -98,12 +139,49 @@ def show_main_menu():
     )
     btn_random.grid(row=4, column=0, columnspan=2, padx=6, pady=8)
 
+    btn_weak = tk.Button(
+        frame, text="Slabá místa", font=("Arial", 14), width=22,
+        command=lambda: start_weak_spots(ALL_QUESTIONS),
+        state="normal" if all_count > 0 else "disabled"
+    )
+    btn_weak.grid(row=5, column=0, columnspan=2, padx=6, pady=8)
+
+    btn_spaced = tk.Button(
+        frame, text="Opakování s rozestupy", font=("Arial", 14), width=22,
+        command=lambda: start_quiz(root, ALL_QUESTIONS, show_main_menu, spaced=True),
+        state="normal" if all_count > 0 else "disabled"
+    )
+    btn_spaced.grid(row=6, column=0, columnspan=2, padx=6, pady=8)
+
     btn_view = tk.Button(
         frame, text="Pouze prohlížení (se správnými odpověďmi)", font=("Arial", 13), width=42,
         command=lambda: start_view(ALL_QUESTIONS),
         state="normal" if all_count > 0 else "disabled"
     )
-    btn_view.grid(row=5, column=0, columnspan=2, pady=(18, 6))
+    btn_view.grid(row=7, column=0, columnspan=2, pady=(18, 6))
+
+    # Fulltextové hledání: test jen z otázek odpovídajících dotazu
+    search_frame = tk.Frame(frame)
+    search_frame.grid(row=8, column=0, columnspan=2, pady=(6, 0))
+    tk.Label(search_frame, text="Hledat:", font=("Arial", 12)).pack(side="left")
+    search_var = tk.StringVar()
+    tk.Entry(search_frame, textvariable=search_var, width=28, font=("Arial", 12)).pack(side="left", padx=6)
+    search_count = tk.Label(search_frame, text="", font=("Arial", 11), width=14, anchor="w")
+    search_count.pack(side="left")
+    found = []
+
+    def on_search(*_):
+        matches = BANK.search(search_var.get())
+        found[:] = matches or []
+        search_count.config(text="" if matches is None else f"Nalezeno: {len(found)}")
+        btn_search.config(state="normal" if found else "disabled")
+
+    btn_search = tk.Button(
+        search_frame, text="Test z nalezených", font=("Arial", 11), state="disabled",
+        command=lambda: start_test(list(found))
+    )
+    btn_search.pack(side="left", padx=6)
+    search_var.trace_add("write", on_search)
 
     # Dolní panel pro pokračování/statistiky
     bottom_frame = tk.Frame(root)
@@ -113,7 +191,7 @@ def show_main_menu():
         bottom_frame, text="Pokračovat v testu", font=("Arial", 14),
         width=30,
         state="normal" if session_exists() else "disabled",
-        command=lambda: continue_last_test(root, ALL_QUESTIONS, show_main_menu)
+        command=lambda: continue_last_test(root, BANK, show_main_menu)
     )
     btn_continue.pack(pady=7)
 
@@ -121,11 +199,20 @@ def show_main_menu():
         bottom_frame, text="Statistiky", font=("Arial", 14),
         width=30,
         command=lambda: show_stats_window(
-            root, ALL_QUESTIONS, load_stats, save_stats, show_stats_window
+            root, BANK, stats_writer, show_stats_window
         )
     )
     btn_stats.pack(pady=7)
 
+def on_close():
+    # Dopíše statistiky a počká na všechny zápisy I/O vlákna
+    stats_writer.close()
+    get_io_worker().close()
+    root.destroy()
+
 root = tk.Tk()
+stats_writer = get_stats_writer()
+stats_writer.attach(root)
+root.protocol("WM_DELETE_WINDOW", on_close)
 show_main_menu()
 root.mainloop()
@@ -0,0 +1,143 @@
+# merge_banks.py
+#
+# Sloučení více bank otázek (JSON/JSONL) do jedné s jedinečnými ID.
+# Použití: python app/merge_banks.py a.json b.jsonl ... --out merged_questions.json
+#          [--mapping id_map.json] [--on-conflict first|both|error]
+#          [--stats stats.json --stats-from a.json --stats-out stats_merged.json]
+
+import argparse
+import hashlib
+import os
+import sys
+
+from data import iter_questions, load_stats, atomic_write_json
+from search import normalize
+from generate_bank import write_bank
+from dedupe import remap_stats
+
+class MergeConflict(Exception):
+    """Stejná otázka s jinou odpovědí při --on-conflict error."""
+
+def _digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(normalize(" ".join(str(part).split())).encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+def content_hash(q):
+    """Hash obsahu otázky nezávislý na ID, pořadí možností, diakritice a bílých znacích."""
+    return _digest([q.type or "", q.text] + sorted(str(v) for v in q.option_texts))
+
+def answer_hash(q):
+    answer = q.answer
+    return _digest(sorted(str(text) for key, text in q.options if key in answer))
+
+def _max_id(sources):
+    top = 0
+    for source in sources:
+        for q in iter_questions(source):
+            if isinstance(q.id, int):
+                top = max(top, q.id)
+    return top
+
+def merge_banks(sources, on_conflict="first"):
+    """Generátor sloučených otázek; vrací (generátor, mapping, conflicts).
+
+    mapping je {zdroj: {původní ID: nové ID}} jen pro změněná ID a otázky
+    sloučené s dřívější kopií; conflicts se plní během iterace. V paměti se drží
+    jen použitá ID a 16bajtové hashe obsahu, nikdy celé otázky.
+    """
+    mapping = {source: {} for source in sources}
+    conflicts = []
+
+    def merged():
+        next_id = _max_id(sources) + 1
+        used = set()
+        seen = {}  # hash obsahu -> (ID, hash odpovědi)
+        for source in sources:
+            remap = mapping[source]
+            for q in iter_questions(source):
+                old_id = q.id
+                key = content_hash(q)
+                answers = answer_hash(q)
+                if key in seen:
+                    kept_id, kept_answers = seen[key]
+                    if kept_answers == answers or on_conflict == "first":
+                        if kept_answers != answers:
+                            conflicts.append({"source": source, "id": old_id, "kept_id": kept_id})
+                        if old_id is not None:
+                            remap[str(old_id)] = kept_id
+                        continue
+                    conflicts.append({"source": source, "id": old_id, "kept_id": kept_id})
+                    if on_conflict == "error":
+                        raise MergeConflict(f"Konfliktní odpovědi: {source} ID {old_id} vs. ID {kept_id}")
+                if isinstance(old_id, int) and old_id not in used:
+                    new_id = old_id
+                else:
+                    new_id = next_id
+                    next_id += 1
+                    if old_id is not None:
+                        remap[str(old_id)] = new_id
+                used.add(new_id)
+                seen.setdefault(key, (new_id, answers))
+                yield q.replace(id=new_id).to_json()
+
+    return merged(), mapping, conflicts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sloučí banky otázek a přidělí jedinečná ID.")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("--out", required=True, help="výstupní banka (.json nebo .jsonl)")
+    parser.add_argument("--mapping", help="soubor s mapováním {zdroj: {staré ID: nové ID}}")
+    parser.add_argument("--on-conflict", choices=("first", "both", "error"), default="first",
+                        help="stejná otázka s jinou odpovědí: ponechat první, obě, nebo skončit chybou")
+    parser.add_argument("--stats", help="stats.json k přečíslování")
+    parser.add_argument("--stats-from", help="zdrojová banka, ke které stats.json patří (výchozí první)")
+    parser.add_argument("--stats-out", help="výstup přečíslovaných statistik")
+    args = parser.parse_args(argv)
+
+    # Vstupy se čtou líně až při zápisu, výstup proto nesmí být žádný ze vstupů
+    out_path = os.path.realpath(args.out)
+    if any(os.path.realpath(source) == out_path for source in args.sources):
+        print(f"Výstup {args.out} je zároveň vstupem; zvol jiný soubor.", file=sys.stderr)
+        return 1
+    stats_source = args.sources[0]
+    if args.stats_from:
+        # Stejný soubor může být zapsaný jinak ("./a.json" vs "a.json")
+        wanted = os.path.realpath(args.stats_from)
+        matches = [source for source in args.sources if os.path.realpath(source) == wanted]
+        if not matches:
+            print(f"--stats-from {args.stats_from} není mezi vstupními bankami.", file=sys.stderr)
+            return 1
+        stats_source = matches[0]
+    questions, mapping, conflicts = merge_banks(args.sources, args.on_conflict)
+    # Banka se zapisuje do dočasného souboru a nahradí výstup, až když je celá
+    # (přípona zůstává poslední, write_bank podle ní volí JSON / JSON Lines)
+    base, ext = os.path.splitext(args.out)
+    tmp = f"{base}.tmp{ext}"
+    try:
+        write_bank(questions, tmp)
+    except MergeConflict as e:
+        os.remove(tmp)
+        print(e, file=sys.stderr)
+        return 1
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, args.out)
+    for conflict in conflicts:
+        print(f"Konflikt: {conflict['source']} ID {conflict['id']} má jinou odpověď než ID {conflict['kept_id']}",
+              file=sys.stderr)
+    if args.mapping:
+        atomic_write_json(mapping, args.mapping)
+    if args.stats and args.stats_out:
+        remap = mapping[stats_source]
+        atomic_write_json(remap_stats(load_stats(args.stats), remap), args.stats_out)
+    print(f"Sloučeno do {args.out}, přečíslováno {sum(map(len, mapping.values()))}, konfliktů {len(conflicts)}",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
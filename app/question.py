@@ -0,0 +1,107 @@
+# question.py
+
+import sys
+
+_EMPTY = ()
+# Sdílené n-tice klíčů možností – většina banky má stejné ("a", "b", ...)
+_option_keys = {}
+_strings = {}
+
+def _shared(value, cache):
+    return cache.setdefault(value, value)
+
+class Question:
+    """Jedna otázka z banky: neměnná, se __slots__ a bez vnořených dictů.
+
+    Možnosti jsou dvě n-tice (klíče sdílené mezi otázkami, texty), správná
+    odpověď je bitová maska (bit i = i-tá možnost), typ a tagy jsou internované.
+    from_json/to_json převádí z/do formátu merged_questions.json.
+    """
+    __slots__ = ("id", "type", "text", "option_keys", "option_texts", "answer_mask",
+                 "explanation", "table", "tags", "extra")
+
+    def __init__(self, id, type, text, option_keys, option_texts, answer_mask,
+                 explanation=None, table=None, tags=_EMPTY, extra=None):
+        set_ = object.__setattr__
+        set_(self, "id", id)
+        set_(self, "type", type)
+        set_(self, "text", text)
+        set_(self, "option_keys", option_keys)
+        set_(self, "option_texts", option_texts)
+        set_(self, "answer_mask", answer_mask)
+        set_(self, "explanation", explanation)
+        set_(self, "table", table)
+        set_(self, "tags", tags)
+        set_(self, "extra", extra)
+
+    @classmethod
+    def from_json(cls, obj):
+        obj = dict(obj)
+        options = obj.pop("options")
+        answer = set(obj.pop("answer"))
+        keys = _shared(tuple(sys.intern(str(k)) for k in options), _option_keys)
+        q_type = obj.pop("type", None)
+        tags = obj.pop("tags", None)
+        return cls(
+            obj.pop("id", None),
+            None if q_type is None else _shared(sys.intern(q_type), _strings),
+            obj.pop("question", ""),
+            keys,
+            tuple(options.values()),
+            sum(1 << i for i, key in enumerate(keys) if key in answer),
+            obj.pop("explanation", None),
+            obj.pop("table", None),
+            tuple(sys.intern(t) for t in tags) if tags else _EMPTY,
+            # Neznámé klíče se zachovají, aby to_json vrátil původní záznam
+            obj or None,
+        )
+
+    def to_json(self):
+        obj = {"id": self.id}
+        if self.type is not None:
+            obj["type"] = self.type
+        obj["question"] = self.text
+        obj["options"] = dict(zip(self.option_keys, self.option_texts))
+        obj["answer"] = list(self.answer)
+        if self.table is not None:
+            obj["table"] = self.table
+        if self.explanation is not None:
+            obj["explanation"] = self.explanation
+        if self.tags:
+            obj["tags"] = list(self.tags)
+        if self.extra:
+            obj.update(self.extra)
+        return obj
+
+    @property
+    def options(self):
+        """Možnosti jako n-tice dvojic (klíč, text) v pořadí z banky."""
+        return tuple(zip(self.option_keys, self.option_texts))
+
+    @property
+    def answer(self):
+        """Klíče správných možností v pořadí z banky."""
+        mask = self.answer_mask
+        return tuple(key for i, key in enumerate(self.option_keys) if mask >> i & 1)
+
+    def keys_mask(self, keys):
+        """Maska odpovědi z klíčů možností (např. od webového klienta)."""
+        return sum(1 << i for i, key in enumerate(self.option_keys) if key in keys)
+
+    def replace(self, **fields):
+        """Kopie otázky se změněnými poli (např. přečíslované ID)."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields)
+        return Question(**values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Question je neměnná")
+
+    def __delattr__(self, name):
+        raise AttributeError("Question je neměnná")
+
+    def __reduce__(self):
+        return Question, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Question(id={self.id!r}, type={self.type!r}, text={self.text[:40]!r})"
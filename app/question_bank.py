@@ -0,0 +1,74 @@
+# question_bank.py
+
+class QuestionBank:
+    """Index nad bankou otázek, sestavený jednou při načtení.
+
+    Nabízí vyhledání podle ID v O(1), předpočítané seznamy a počty podle
+    typu a tagu a jejich libovolné kombinace. Všechny obrazovky sdílejí
+    jednu instanci místo opakovaného procházení celé banky.
+    """
+    def __init__(self, questions, search_index=None):
+        self.search_index = search_index
+        self.questions = []
+        self.by_id = {}
+        self.by_type = {}
+        self.by_tag = {}
+        for q in questions:
+            self.questions.append(q)
+            if q.id is not None:
+                self.by_id[q.id] = q
+            self.by_type.setdefault(q.type, []).append(q)
+            for tag in q.tags:
+                self.by_tag.setdefault(tag, []).append(q)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def get(self, question_id):
+        """Vrací otázku podle ID; přijímá i ID jako řetězec (klíče ve stats.json)."""
+        q = self.by_id.get(question_id)
+        if q is None and isinstance(question_id, str) and question_id.lstrip("-").isdigit():
+            q = self.by_id.get(int(question_id))
+        return q
+
+    def search(self, query):
+        """Otázky odpovídající fulltextovému dotazu; None pro prázdný dotaz nebo chybějící index."""
+        if self.search_index is None:
+            return None
+        positions = self.search_index.search(query)
+        if positions is None:
+            return None
+        return [self.questions[pos] for pos in positions]
+
+    def of_type(self, q_type):
+        return self.by_type.get(q_type, [])
+
+    def with_tag(self, tag):
+        return self.by_tag.get(tag, [])
+
+    def count(self, q_type=None):
+        if q_type is None:
+            return len(self.questions)
+        return len(self.of_type(q_type))
+
+    def filter(self, types=None, tags=None, ids=None):
+        """Otázky splňující všechny zadané podmínky (typ z types, alespoň jeden tag z tags, ID z ids)."""
+        # Začne nejužším předpočítaným seznamem a zbylé podmínky jen dofiltruje
+        if ids is not None:
+            candidates = [q for q in map(self.get, ids) if q is not None]
+        elif tags is not None:
+            candidates = list({id(q): q for tag in tags for q in self.with_tag(tag)}.values())
+        elif types is not None:
+            candidates = [q for t in types for q in self.of_type(t)]
+        else:
+            return self.questions
+        if types is not None:
+            types = set(types)
+            candidates = [q for q in candidates if q.type in types]
+        if tags is not None:
+            tags = set(tags)
+            candidates = [q for q in candidates if tags.intersection(q.tags)]
+        return candidates
@@ -1,24 +1,66 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
 import string
+import time
+import uuid
 
-from data import save_stats, save_session, load_session, clear_session
+from data import (
+    save_session,
+    append_session_event,
+    load_session,
+    load_session_events,
+    clear_session,
+)
+from storage import get_stats_writer
+from io_worker import get_io_worker
+from quiz_engine import QuizEngine, SpacedEngine, replay_session, resolve_session
+from scheduler import SpacedScheduler
 
 def clear_widgets(container):
     for widget in container.winfo_children():
         widget.destroy()
 
-def restore_answers(q_list):
-    for q in q_list:
-        if isinstance(q.get("answer"), list):
-            q["answer"] = set(q["answer"])
-    return q_list
+class OptionRow:
+    """Jeden znovupoužitelný řádek možnosti (checkbox + popisek)."""
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent)
+        self.var = tk.BooleanVar()
+        self.checkbox = tk.Checkbutton(self.frame, variable=self.var)
+        self.checkbox.pack(side="left")
+        self.label = tk.Label(self.frame, font=("Arial", 12), anchor="w", justify="left", wraplength=950)
+        self.label.pack(side="left", fill="x", expand=True)
+        self.visible = False
+        self.checkable = True
+
+    def show(self, text, color="black", checkable=True):
+        self.label.config(text=text, fg=color)
+        if checkable != self.checkable:
+            if checkable:
+                self.checkbox.pack(side="left", before=self.label)
+            else:
+                self.checkbox.pack_forget()
+            self.checkable = checkable
+        if not self.visible:
+            self.frame.pack(fill="x", anchor="w", pady=2)
+            self.visible = True
+
+    def hide(self):
+        if self.visible:
+            self.frame.pack_forget()
+            self.visible = False
+
+def screen_widgets(root):
+    """Widgety aktuální obrazovky; po přepnutí obrazovky přestanou existovat."""
+    return root.winfo_children()
+
+def screen_unchanged(widgets):
+    """Zda je pořád zobrazená obrazovka se screen_widgets (pro callbacky z I/O vlákna)."""
+    return all(widget.winfo_exists() for widget in widgets)
 
 class QuizApp:
-    def __init__(self, master, questions, view_mode=False, show_main_menu=None, resume_data=None):
-        from data import load_stats
-        self.stats = load_stats()
+    def __init__(self, master, questions, view_mode=False, show_main_menu=None, resume_data=None, schedule=None):
+        self.stats_writer = get_stats_writer()
+        self.stats_writer.attach(master)
         self.master = master
         self.show_main_menu = show_main_menu
         self.view_mode = view_mode
@@ -27,15 +69,23 @@ class QuizApp:
         self.master.geometry("1080x820")
         self.master.resizable(False, False)
         self._setup_widgets()
-        self.all_questions = questions.copy()
+        spaced = schedule is not None
+        if spaced:
+            scheduler = SpacedScheduler(questions, schedule)
+            self.engine = SpacedEngine(scheduler, stats=self.stats_writer)
+        else:
+            self.engine = QuizEngine(questions, stats=self.stats_writer, resume_data=resume_data)
+        # Rozpracovaná session se ukládá jen u běžného testu
+        self.persist = not view_mode and self.engine.resumable
         self.current_options = []
-        self.elapsed_seconds = 0
+        self.vars = {}
         self._timer_running = False
-        if resume_data:
-            self._load_session(resume_data)
+        self._start_session()
+        self._save_progress()
+        if spaced and self.engine.finished:
+            self._end_quiz()
         else:
-            self._reset_quiz()
-        self._show_question()
+            self._show_question()
 
     def _setup_widgets(self):
         self.counter_label = tk.Label(self.master, font=("Arial", 12))
@@ -50,6 +100,17 @@ class QuizApp:
         self.question_label.pack(pady=10)
         self.options_frame = tk.Frame(self.master)
         self.options_frame.pack()
+        # Pool řádků možností: řádky se mezi otázkami jen přenastavují, nové vznikají jen při nedostatku
+        self.rows_frame = tk.Frame(self.options_frame)
+        self.rows_frame.pack(fill="x")
+        self.option_rows = []
+        self.explanation_label = tk.Label(
+            self.options_frame,
+            font=("Arial", 11, "italic"),
+            fg="gray20",
+            wraplength=950,
+            justify="left"
+        )
         self.feedback_label = tk.Label(self.master, font=("Arial", 12))
         self.feedback_label.pack(pady=10)
         self.button = tk.Button(self.master, command=self._check_answer)
@@ -64,82 +125,72 @@ class QuizApp:
     def _start_timer(self):
         if not self._timer_running or self.view_mode:
             return
-        mins, secs = divmod(self.elapsed_seconds, 60)
+        mins, secs = divmod(self.engine.elapsed_seconds, 60)
         self.timer_label.config(text=f"Doba trvání testu: {mins:02}:{secs:02}")
-        self.elapsed_seconds += 1
+        self.engine.elapsed_seconds += 1
         # Zajistí, že se další volání provede přesně po 1 sekundě
         self.master.after(1000, self._start_timer)
 
     def _back_to_menu(self):
         clear_widgets(self.master)
         self._timer_running = False
+        self.stats_writer.flush()
+        # Menu čte stav ze disku (např. rozpracovanou session), zápisy musí být hotové
+        get_io_worker().flush()
         if self.show_main_menu:
             self.show_main_menu()
 
-    def _reset_quiz(self):
-        self.question_list = self.all_questions.copy()
-        random.shuffle(self.question_list)
-        self.question_index = 0
-        self.score = 0
-        self.vars = {}
-        self.wrong_questions = []
-        self.mode = "first_run"
-        self.kolo = 1
+    def _start_session(self):
         self.round_label.config(text="")
         self.question_label.config(font=("Arial", 14), pady=0)
         self.current_options = []
-        self.elapsed_seconds = 0
         self._timer_running = not self.view_mode
         if not self.view_mode:
             self._start_timer()
 
-    def _load_session(self, data):
-        self.question_list = data["question_list"]
-        self.question_index = data["question_index"]
-        self.kolo = data["kolo"]
-        self.mode = data["mode"]
-        self.score = data["score"]
-        self.wrong_questions = data["wrong_questions"]
-        self.all_questions = data["all_questions"]
-        self.vars = {}
-        self.current_options = data.get("current_options", [])
-        self.elapsed_seconds = data.get("elapsed_seconds", 0)
-        self._timer_running = not self.view_mode
-        if not self.view_mode:
-            self._start_timer()
+    def _save_progress(self):
+        """Zapíše kompletní snapshot session (kompakce žurnálu)."""
+        if self.persist:
+            self._session_gen = uuid.uuid4().hex
+            data = self.engine.session_data()
+            data["generation"] = self._session_gen
+            # Zapisuje I/O vlákno; čekající starší snapshot se nahradí tímto
+            get_io_worker().submit(save_session, data, key="session")
 
-    def _get_session_data(self):
-        return {
-            "question_list": self.question_list,
-            "question_index": self.question_index,
-            "kolo": self.kolo,
-            "mode": self.mode,
-            "score": self.score,
-            "wrong_questions": self.wrong_questions,
-            "all_questions": self.all_questions,
-            "current_options": self.current_options,
-            "elapsed_seconds": self.elapsed_seconds,
-        }
+    def _log_event(self, kind, **fields):
+        """Připíše malou událost do žurnálu místo přepisu celé session."""
+        if self.persist:
+            event = {"e": kind, "g": self._session_gen, "t": self.engine.elapsed_seconds, **fields}
+            get_io_worker().submit(append_session_event, event)
 
-    def _save_progress(self):
-        if not self.view_mode:
-            save_session(self._get_session_data())
+    def _option_row(self, idx):
+        while len(self.option_rows) <= idx:
+            self.option_rows.append(OptionRow(self.rows_frame))
+        return self.option_rows[idx]
+
+    def _hide_options(self, start=0):
+        for row in self.option_rows[start:]:
+            row.hide()
+        self.explanation_label.pack_forget()
+
+    def _show_explanation(self):
+        if self.q.explanation:
+            self.explanation_label.config(text=f"Vysvětlení: {self.q.explanation}")
+            self.explanation_label.pack(fill="x", anchor="w", pady=(6, 0))
+        else:
+            self.explanation_label.pack_forget()
 
     def _show_options(self, mark_correct=None, user_selected=None):
-        clear_widgets(self.options_frame)
         self.vars = {}
         option_labels = self.option_keys[:len(self.current_options)]
+        answer = self.q.answer
         for idx, (orig_key, value) in enumerate(self.current_options):
             key = option_labels[idx]
-            var = tk.BooleanVar()
-            frame = tk.Frame(self.options_frame)
-            frame.pack(fill="x", anchor="w", pady=2)
-            cb = tk.Checkbutton(frame, variable=var)
-            cb.pack(side="left")
+            row = self._option_row(idx)
             color = "black"
             mark = ""
             if mark_correct is not None:
-                is_correct = orig_key in self.q["answer"]
+                is_correct = orig_key in answer
                 checked = user_selected and key in user_selected
                 if is_correct and checked:
                     mark, color = "✅", "green"
@@ -147,23 +198,31 @@ class QuizApp:
                     mark, color = "➕", "orange"
                 elif not is_correct and checked:
                     mark, color = "❌", "red"
-            lbl = tk.Label(frame, text=f"{mark} {key}) {value}", font=("Arial", 12), fg=color, anchor="w", justify="left", wraplength=950)
-            lbl.pack(side="left", fill="x", expand=True)
-            self.vars[key] = var
+                row.checkbox.config(state="disabled")
+            else:
+                row.var.set(False)
+                row.checkbox.config(state="normal")
+            row.show(f"{mark} {key}) {value}", color)
+            self.vars[key] = row.var
+        self._hide_options(len(self.current_options))
         return option_labels
 
     def _show_question(self):
-        self._save_progress()
         self.feedback_label.config(text="", fg="black")
-        self.q = self.question_list[self.question_index]
-        total = len(self.question_list)
-        self.counter_label.config(text=f"Otázka {self.question_index + 1} / {total}")
-        self.round_label.config(text="První kolo" if self.mode == "first_run" else f"Opakovací kolo {self.kolo - 1}")
-        self.question_label.config(text=self.q["question"])
-        if "table" in self.q:
+        engine = self.engine
+        self.q = engine.current
+        if engine.mode == "spaced":
+            self.counter_label.config(text=f"Otázka {engine.question_index + 1} (k opakování: {engine.scheduler.due_count()})")
+            self.round_label.config(text="Opakování s rozestupy")
+        else:
+            total = len(engine.question_list)
+            self.counter_label.config(text=f"Otázka {engine.question_index + 1} / {total}")
+            self.round_label.config(text="První kolo" if engine.mode == "first_run" else f"Opakovací kolo {engine.kolo - 1}")
+        self.question_label.config(text=self.q.text)
+        if self.q.table is not None:
             pass
-        self.current_options = list(self.q["options"].items())
-        random.shuffle(self.current_options)
+        self.current_options = engine.current_options()
+        self._shown_at = time.monotonic()
         self._show_options()
         if self.view_mode:
             self._show_correct_answers()
@@ -174,129 +233,124 @@ class QuizApp:
             self.restart_button.config(state="disabled")
 
     def _show_correct_answers(self):
-        clear_widgets(self.options_frame)
         option_labels = self.option_keys[:len(self.current_options)]
+        answer = self.q.answer
         for idx, (orig_key, value) in enumerate(self.current_options):
-            is_correct = orig_key in self.q["answer"]
+            is_correct = orig_key in answer
             mark = "✅" if is_correct else ""
             color = "green" if is_correct else "black"
             text = f"{mark} {option_labels[idx]}) {value}"
-            lbl = tk.Label(self.options_frame, text=text, fg=color, font=("Arial", 12), anchor="w")
-            lbl.pack(fill="x", anchor="w")
+            self._option_row(idx).show(text, color, checkable=False)
         self.feedback_label.config(text="Správná odpověď je zvýrazněná.", fg="blue")
-        if self.q.get("explanation"):
-            explanation_label = tk.Label(
-                self.options_frame,
-                text=f"Vysvětlení: {self.q['explanation']}",
-                font=("Arial", 11, "italic"),
-                fg="gray20",
-                wraplength=950,
-                justify="left"
-            )
-            explanation_label.pack(fill="x", anchor="w", pady=(6, 0))
+        self._show_explanation()
 
     def _check_answer(self):
         if self.view_mode:
             self._next_question()
             return
-        question_id = self.q.get("id")
-        if question_id is not None:
-            str_id = str(question_id)
-            self.stats.setdefault(str_id, {"total": 0, "correct": 0, "wrong": 0})
-            self.stats[str_id]["total"] += 1
-        option_labels = self.option_keys[:len(self.current_options)]
-        user_selected = {k for k, v in self.vars.items() if v.get()}
-        user_set = {self.current_options[option_labels.index(k)][0] for k in user_selected}
-        correct = user_set == self.q["answer"]
+        positions = [idx for idx, var in enumerate(self.vars.values()) if var.get()]
+        user_selected = {self.option_keys[idx] for idx in positions}
+        mask = self.engine.selection_mask(positions)
+        correct = self.engine.answer(mask, time.monotonic() - self._shown_at)
         self._show_options(mark_correct=True, user_selected=user_selected)
         if correct:
             self.feedback_label.config(text="Správně!", fg="green")
-            self.score += 1
-            if question_id is not None:
-                self.stats[str_id]["correct"] += 1
         else:
             self.feedback_label.config(text="Špatně!", fg="red")
-            if self.q not in self.wrong_questions:
-                self.wrong_questions.append(self.q)
-            if question_id is not None:
-                self.stats[str_id]["wrong"] += 1
-        save_stats(self.stats)
-        if self.q.get("explanation"):
-            explanation_label = tk.Label(
-                self.options_frame,
-                text=f"Vysvětlení: {self.q['explanation']}",
-                font=("Arial", 11, "italic"),
-                fg="gray20",
-                wraplength=950,
-                justify="left"
-            )
-            explanation_label.pack(fill="x", anchor="w", pady=(6, 0))
+        self._show_explanation()
         self.button.config(text="Další", command=self._next_question)
-        self._save_progress()
+        self._log_event("answered", correct=correct)
 
     def _next_question(self):
-        self.question_index += 1
-        if self.question_index < len(self.question_list):
+        step = self.engine.advance()
+        if step == "next":
+            self._log_event("advanced")
+            self._show_question()
+            self.button.config(text="Odpovědět", command=self._check_answer)
+        elif step == "round":
+            # Konec kola: událost pro případ pádu a poté kompakce do snapshotu
+            self._log_event("round_started")
+            self._save_progress()
+            messagebox.showinfo("Opakování", f"Teď si zopakuješ špatně zodpovězené otázky!\n(Opakovací kolo {self.engine.kolo - 1})")
             self._show_question()
             self.button.config(text="Odpovědět", command=self._check_answer)
         else:
-            if self.wrong_questions:
-                self.kolo += 1
-                self.question_list = self.wrong_questions.copy()
-                self.wrong_questions = []
-                self.question_index = 0
-                if self.mode == "first_run":
-                    self.mode = "repeat_wrong"
-                messagebox.showinfo("Opakování", f"Teď si zopakuješ špatně zodpovězené otázky!\n(Opakovací kolo {self.kolo - 1})")
-                self._show_question()
-                self.button.config(text="Odpovědět", command=self._check_answer)
-            else:
-                self._end_quiz()
+            self._end_quiz()
 
     def _end_quiz(self):
-        clear_widgets(self.options_frame)
+        self._hide_options()
         self._timer_running = False
         self.question_label.config(text="🥳", font=("Arial", 48), pady=20)
         self.counter_label.config(text="")
         self.round_label.config(text="")
-        text = f"Hotovo! Zvládl/a jsi správně odpovědět na všechny otázky.\n"
-        text += f"Počet kol (včetně prvního): {self.kolo}\n"
+        if self.engine.mode == "spaced":
+            text = "Pro teď není nic k opakování.\n"
+            text += f"Zopakováno otázek: {self.engine.question_index}, správně: {self.engine.score}\n"
+        else:
+            text = f"Hotovo! Zvládl/a jsi správně odpovědět na všechny otázky.\n"
+            text += f"Počet kol (včetně prvního): {self.engine.kolo}\n"
         if not self.view_mode:
-            mins, secs = divmod(self.elapsed_seconds, 60)
+            mins, secs = divmod(self.engine.elapsed_seconds, 60)
             text += f"Celkový čas: {mins:02}:{secs:02}"
-            self.stats["latest_duration"] = self.elapsed_seconds
-            save_stats(self.stats)
+            self.stats_writer.set_value("latest_duration", self.engine.elapsed_seconds)
+            self.stats_writer.flush()
         self.feedback_label.config(text=text, fg="blue")
         self.button.config(state="disabled")
         self.menu_button.config(state="normal")
-        if self.view_mode:
-            self.restart_button.config(state="disabled")
-        else:
+        if self.persist:
             self.restart_button.config(state="normal")
-            clear_session()
+            get_io_worker().submit(clear_session, key="session")
+        else:
+            self.restart_button.config(state="disabled")
 
     def _restart(self):
-        self._reset_quiz()
+        get_io_worker().submit(clear_session, key="session")
+        self.engine.reset()
+        self._start_session()
+        self._save_progress()
         self._show_question()
         self.button.config(state="normal")
         self.feedback_label.config(text="")
         self.restart_button.config(state="disabled")
-        clear_session()
 
-def start_quiz(root, selected_questions, show_main_menu, view_mode=False, resume_data=None):
-    clear_session()
+def start_quiz(root, selected_questions, show_main_menu, view_mode=False, resume_data=None, spaced=False):
+    if spaced:
+        # Plán opakování se čte v I/O vlákně; test se otevře, až bude načtený
+        widgets = screen_widgets(root)
+
+        def open_spaced(schedule):
+            if screen_unchanged(widgets):
+                _open_quiz(root, selected_questions, show_main_menu, schedule=schedule)
+
+        get_stats_writer().request_schedule(open_spaced)
+        return
+    get_io_worker().submit(clear_session, key="session")
+    _open_quiz(root, selected_questions, show_main_menu, view_mode=view_mode, resume_data=resume_data)
+
+def _open_quiz(root, questions, show_main_menu, **options):
     for widget in root.winfo_children():
         widget.destroy()
-    QuizApp(root, selected_questions, view_mode=view_mode, show_main_menu=show_main_menu, resume_data=resume_data)
+    QuizApp(root, questions, show_main_menu=show_main_menu, **options)
 
-def continue_last_test(root, ALL_QUESTIONS, show_main_menu):
+def _read_last_session():
     data = load_session()
+    return data and replay_session(data, load_session_events())
+
+def continue_last_test(root, bank, show_main_menu):
+    # Session se čte v I/O vlákně; test se otevře, až bude načtená
+    get_io_worker().submit(
+        _read_last_session,
+        callback=lambda data: _resume_session(root, bank, show_main_menu, data),
+    )
+
+def _resume_session(root, bank, show_main_menu, data):
     if not data:
         messagebox.showerror("Chyba", "Nenalezena rozpracovaná session.")
         return
-    data["question_list"] = restore_answers(data["question_list"])
-    data["all_questions"] = restore_answers(data["all_questions"])
-    data["wrong_questions"] = restore_answers(data["wrong_questions"])
+    data = resolve_session(data, bank)
+    if not data["question_list"]:
+        messagebox.showerror("Chyba", "Otázky z rozpracované session už v sadě nejsou.")
+        return
     start_quiz(
         root,
         data["all_questions"],
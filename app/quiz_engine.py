@@ -0,0 +1,230 @@
+# quiz_engine.py
+
+import random
+
+from data import SESSION_VERSION
+
+def _wrong_key(q):
+    # Otázky bez ID (jen ruční testy) se rozliší podle identity objektu
+    return id(q) if q.id is None else q.id
+
+def apply_session_event(data, event, wrong_seen=None):
+    """Přehraje jednu událost žurnálu nad daty session (viz QuizApp._log_event).
+
+    wrong_seen je volitelná množina ID z data["wrong_ids"]; replay_session ji
+    drží, aby kontrola duplicit nebyla lineární v délce seznamu.
+    """
+    kind = event["e"]
+    if wrong_seen is None:
+        wrong_seen = set(data["wrong_ids"])
+    if kind == "answered":
+        if event["correct"]:
+            data["score"] += 1
+        else:
+            qid = data["question_ids"][data["question_index"]]
+            if qid not in wrong_seen:
+                wrong_seen.add(qid)
+                data["wrong_ids"].append(qid)
+    elif kind == "advanced":
+        data["question_index"] += 1
+    elif kind == "round_started":
+        data["kolo"] += 1
+        data["question_ids"] = data["wrong_ids"].copy()
+        data["wrong_ids"] = []
+        wrong_seen.clear()
+        data["question_index"] = 0
+        data["mode"] = "repeat_wrong"
+    data["elapsed_seconds"] = event.get("t", data.get("elapsed_seconds", 0))
+
+def replay_session(data, events):
+    """Obnoví stav session ze snapshotu a událostí, které k němu patří."""
+    generation = data.get("generation")
+    wrong_seen = set(data["wrong_ids"])
+    for event in events:
+        if event.get("g") == generation:
+            apply_session_event(data, event, wrong_seen)
+    return data
+
+def resolve_session(data, bank):
+    """Nahradí ID v session otázkami z načtené banky. Chybějící ID se vynechají."""
+    def resolve(ids):
+        return bank.filter(ids=ids)
+    data["all_questions"] = resolve(data["all_ids"])
+    data["question_list"] = resolve(data["question_ids"])
+    data["wrong_questions"] = resolve(data["wrong_ids"])
+    data["question_index"] = min(data["question_index"], max(len(data["question_list"]) - 1, 0))
+    return data
+
+class QuizEngine:
+    """Stav a pravidla testu bez jakékoli závislosti na UI.
+
+    Drží pořadí otázek, kola s opakováním špatných odpovědí, skóre a čas.
+    QuizApp je nad ním jen zobrazení; engine jde stejně dobře pustit v
+    simulaci nebo v profileru.
+    """
+    resumable = True
+
+    def __init__(self, questions, stats=None, resume_data=None, seed=None):
+        self.all_questions = list(questions)
+        # Volitelný zapisovač statistik s metodou record_answer (např. StatsWriter)
+        self.stats = stats
+        if resume_data:
+            self.load(resume_data)
+        else:
+            self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.question_list = self.all_questions.copy()
+        random.Random(self.seed).shuffle(self.question_list)
+        self.question_index = 0
+        self.score = 0
+        # Špatně zodpovězené otázky jako uspořádaná množina: klíč (ID) -> otázka
+        self.wrong = {}
+        self.mode = "first_run"
+        self.kolo = 1
+        self.elapsed_seconds = 0
+        self._permutation_key = None
+
+    def load(self, data):
+        """Převezme data session, ve kterých už jsou ID nahrazená otázkami (resolve_session)."""
+        self.all_questions = data["all_questions"]
+        self.question_list = data["question_list"]
+        self.question_index = data["question_index"]
+        self.wrong = {_wrong_key(q): q for q in data["wrong_questions"]}
+        self.kolo = data["kolo"]
+        self.mode = data["mode"]
+        self.score = data["score"]
+        self.seed = data["seed"]
+        self.elapsed_seconds = data.get("elapsed_seconds", 0)
+        self._permutation_key = None
+
+    def session_data(self):
+        return {
+            "version": SESSION_VERSION,
+            "seed": self.seed,
+            "all_ids": [q.id for q in self.all_questions],
+            "question_ids": [q.id for q in self.question_list],
+            "wrong_ids": [q.id for q in self.wrong.values()],
+            "question_index": self.question_index,
+            "kolo": self.kolo,
+            "mode": self.mode,
+            "score": self.score,
+            "elapsed_seconds": self.elapsed_seconds,
+        }
+
+    @property
+    def wrong_questions(self):
+        return list(self.wrong.values())
+
+    @property
+    def current(self):
+        return self.question_list[self.question_index]
+
+    def current_permutation(self):
+        """Pořadí možností aktuální otázky: pozice na obrazovce -> index původní možnosti.
+
+        Je dané seedem session, kolem a pozicí, takže se po obnovení nezmění.
+        """
+        key = (self.kolo, self.question_index)
+        if self._permutation_key != key:
+            permutation = list(range(len(self.current.option_keys)))
+            random.Random(f"{self.seed}:{self.kolo}:{self.question_index}").shuffle(permutation)
+            self._permutation = permutation
+            self._permutation_key = key
+        return self._permutation
+
+    def current_options(self):
+        """Zamíchané možnosti aktuální otázky jako [(původní klíč, text)]."""
+        options = self.current.options
+        return [options[i] for i in self.current_permutation()]
+
+    def selection_mask(self, positions):
+        """Maska odpovědi z vybraných pozic na obrazovce (bit = index původní možnosti)."""
+        permutation = self.current_permutation()
+        return sum(1 << permutation[pos] for pos in positions)
+
+    def answer(self, mask, duration=0.0):
+        """Vyhodnotí odpověď (maska vybraných možností, viz Question.answer_mask) a vrátí True, pokud je správná."""
+        q = self.current
+        correct = mask == q.answer_mask
+        if correct:
+            self.score += 1
+        else:
+            self.wrong.setdefault(_wrong_key(q), q)
+        if self.stats is not None and q.id is not None:
+            self.stats.record_answer(q.id, correct, duration, self.kolo)
+        return correct
+
+    def advance(self):
+        """Posune test dál. Vrací "next", "round" (začíná opakovací kolo) nebo "finished"."""
+        self.question_index += 1
+        if self.question_index < len(self.question_list):
+            return "next"
+        if not self.wrong:
+            return "finished"
+        self.kolo += 1
+        self.question_list = list(self.wrong.values())
+        self.wrong = {}
+        self.question_index = 0
+        self.mode = "repeat_wrong"
+        return "round"
+
+class SpacedEngine:
+    """Režim opakování s rozestupy: otázky vybírá SpacedScheduler místo opakovacích kol.
+
+    Má stejné rozhraní jako QuizEngine (current, current_options, answer,
+    advance), ale nemá rozpracovanou session – stav je uložený v plánovači.
+    """
+    mode = "spaced"
+    resumable = False
+
+    def __init__(self, scheduler, stats=None, seed=None):
+        self.scheduler = scheduler
+        self.stats = stats
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.kolo = 1
+        self.score = 0
+        self.question_index = 0
+        self.elapsed_seconds = 0
+        self._permutation_key = None
+        self._current = scheduler.next_question()
+
+    @property
+    def finished(self):
+        return self._current is None
+
+    @property
+    def current(self):
+        return self._current
+
+    def current_permutation(self):
+        key = self.question_index
+        if self._permutation_key != key:
+            permutation = list(range(len(self._current.option_keys)))
+            random.Random(f"{self.seed}:{self.question_index}").shuffle(permutation)
+            self._permutation = permutation
+            self._permutation_key = key
+        return self._permutation
+
+    def current_options(self):
+        options = self._current.options
+        return [options[i] for i in self.current_permutation()]
+
+    selection_mask = QuizEngine.selection_mask
+
+    def answer(self, mask, duration=0.0):
+        q = self._current
+        correct = mask == q.answer_mask
+        if correct:
+            self.score += 1
+        state = self.scheduler.review(q.id, correct)
+        if self.stats is not None:
+            self.stats.record_answer(q.id, correct, duration, self.kolo)
+            self.stats.record_review(q.id, state)
+        return correct
+
+    def advance(self):
+        self.question_index += 1
+        self._current = self.scheduler.next_question()
+        return "finished" if self._current is None else "next"
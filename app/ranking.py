@@ -0,0 +1,59 @@
+# ranking.py
+
+import math
+from bisect import bisect_left, insort
+
+def wilson_lower_bound(positive, total, z=1.96):
+    """Dolní mez Wilsonova intervalu spolehlivosti pro podíl positive / total."""
+    if total <= 0:
+        return 0.0
+    p = positive / total
+    z2 = z * z
+    centre = p + z2 / (2 * total)
+    margin = z * math.sqrt((p * (1 - p) + z2 / (4 * total)) / total)
+    return max(0.0, (centre - margin) / (1 + z2 / total))
+
+class WorstQuestions:
+    """Průběžně udržované pořadí nejhorších otázek.
+
+    Obtížnost je dolní mez Wilsonova intervalu pro podíl špatných odpovědí,
+    takže jednou zkažená otázka nepředběhne otázku zkaženou čtyřicetkrát.
+    Seznam je držený seřazený: aktualizace najde místo bisekcí v O(log n),
+    ale smazání a vložení posouvá prvky seznamu, takže celkem je O(n)
+    (jen přesun ukazatelů, pro banky s tisíci otázek zanedbatelný). Výpis
+    top K je O(K).
+    """
+    def __init__(self, stats=None):
+        self._counts = {}
+        self._keys = {}
+        self._order = []
+        if stats:
+            for qid, stat in stats.items():
+                if isinstance(stat, dict) and stat["total"] > 0:
+                    self._counts[qid] = [stat["total"], stat["correct"], stat["wrong"]]
+                    self._keys[qid] = self._key(qid)
+            self._order = sorted(self._keys.values())
+
+    def _key(self, qid):
+        total, correct, wrong = self._counts[qid]
+        return (-wilson_lower_bound(wrong, total), qid)
+
+    def update(self, qid, correct):
+        qid = str(qid)
+        old_key = self._keys.get(qid)
+        if old_key is not None:
+            del self._order[bisect_left(self._order, old_key)]
+        counts = self._counts.setdefault(qid, [0, 0, 0])
+        counts[0] += 1
+        counts[1 if correct else 2] += 1
+        key = self._key(qid)
+        self._keys[qid] = key
+        insort(self._order, key)
+
+    def top(self, k=10):
+        """Vrací až k položek (qid, obtížnost, celkem, správně), od nejhorší."""
+        result = []
+        for neg_score, qid in self._order[:k]:
+            total, correct, _ = self._counts[qid]
+            result.append((qid, -neg_score, total, correct))
+        return result
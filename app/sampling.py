@@ -0,0 +1,86 @@
+# sampling.py
+
+import heapq
+import random
+import time
+
+# Jak moc zvýhodnit otázky, které uživatel dlouho neviděl
+RECENCY_WEIGHT = 1.0
+RECENCY_DAYS = 30
+DAY = 86400
+
+class AliasTable:
+    """Vose alias metoda: sestavení O(n), každé losování podle vah O(1)."""
+    def __init__(self, weights):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("Prázdné váhy")
+        total = float(sum(weights))
+        if total <= 0:
+            weights = [1.0] * n
+            total = float(n)
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+        self.n = n
+
+    def draw(self, rng=random):
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+class WeightedSampler:
+    """Výběr k různých položek s pravděpodobností úměrnou vahám.
+
+    Pro malé k losuje z alias tabulky (sestavené jednou, při prvním použití)
+    a duplicity zahazuje; pro k blízké velikosti populace použije
+    Efraimidis–Spirakis (top k podle u^(1/w)).
+    """
+    def __init__(self, items, weights):
+        self.items = items
+        self.weights = weights
+        self._table = None
+
+    def sample(self, k, rng=random):
+        items, weights = self.items, self.weights
+        k = min(k, len(items))
+        if k == 0:
+            return []
+        if k <= len(items) // 2:
+            if self._table is None:
+                self._table = AliasTable(weights)
+            chosen = {}
+            while len(chosen) < k:
+                chosen.setdefault(self._table.draw(rng), None)
+            return [items[idx] for idx in chosen]
+        keyed = ((rng.random() ** (1.0 / w) if w > 0 else 0.0, idx) for idx, w in enumerate(weights))
+        return [items[idx] for _, idx in heapq.nlargest(k, keyed)]
+
+def weak_spot_weights(questions, stats, last_seen, now=None):
+    """Váha otázky = vyhlazená chybovost × bonus za dobu od posledního pokusu.
+
+    Neviděné otázky mají chybovost 1/2 a plný bonus za nedávnost.
+    """
+    now = time.time() if now is None else now
+    weights = []
+    for q in questions:
+        str_id = str(q.id)
+        stat = stats.get(str_id)
+        if isinstance(stat, dict):
+            error_rate = (stat["wrong"] + 1) / (stat["total"] + 2)
+        else:
+            error_rate = 0.5
+        seen = last_seen.get(str_id)
+        age = 1.0 if seen is None else min(1.0, (now - seen) / (RECENCY_DAYS * DAY))
+        weights.append(error_rate * (1.0 + RECENCY_WEIGHT * age))
+    return weights
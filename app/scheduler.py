@@ -0,0 +1,116 @@
+# scheduler.py
+
+import heapq
+import time
+from collections import deque
+
+# Chybná odpověď: otázka se vrátí za tuto dobu (v sekundách)
+RELEARN_SECONDS = 60
+# Otázky splatné v tomto horizontu se ukážou už v aktuálním sezení
+LEARN_AHEAD_SECONDS = 20 * 60
+# Kolik dosud neviděných otázek se přidá za jedno sezení
+NEW_PER_SESSION = 20
+MIN_EASE = 1.3
+DAY = 86400
+
+def new_state():
+    """Stav SM-2 otázky: [ease, interval ve dnech, počet úspěšných opakování za sebou, splatnost]."""
+    return [2.5, 0, 0, 0.0]
+
+def review_state(state, correct, now):
+    """Vrátí nový stav podle SM-2 (správně = kvalita 4, špatně = kvalita 2)."""
+    ease, interval, reps, _ = state
+    if correct:
+        reps += 1
+        if reps == 1:
+            interval = 1
+        elif reps == 2:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        return [ease, interval, reps, now + interval * DAY]
+    ease = max(MIN_EASE, ease - 0.32)
+    return [ease, 0, 0, now + RELEARN_SECONDS]
+
+class SpacedScheduler:
+    """Plánovač opakování s rozestupy (SM-2) nad haldou splatností.
+
+    Výběr další otázky i přeplánování jsou O(log n). Zastaralé položky
+    haldy se zahazují líně při výběru.
+    """
+    def __init__(self, questions, states, new_limit=NEW_PER_SESSION, clock=time.time):
+        self.clock = clock
+        self.by_id = {}
+        self.states = {}
+        self._heap = []
+        self._new = deque()
+        for q in questions:
+            str_id = str(q.id)
+            self.by_id[str_id] = q
+            if str_id in states:
+                self.states[str_id] = list(states[str_id])
+                self._heap.append((self.states[str_id][3], str_id))
+            else:
+                self._new.append(str_id)
+        heapq.heapify(self._heap)
+        self.new_limit = new_limit
+        self.new_served = 0
+        # Počet opakování v horizontu: spočítá se při prvním due_count, pak jen průběžně
+        self._due_reviews = None
+
+    def _top(self):
+        while self._heap:
+            due, str_id = self._heap[0]
+            if self.states[str_id][3] == due:
+                return due, str_id
+            heapq.heappop(self._heap)
+        return None
+
+    def due_count(self, now=None):
+        """Počet otázek k zopakování v aktuálním horizontu (jen pro zobrazení).
+
+        První volání projde všechny stavy (O(n)), pak review počet jen upravuje
+        v O(1). Otázky, které se do horizontu dostanou samy plynutím času, se
+        do počtu během sezení nepřičtou.
+        """
+        if self._due_reviews is None:
+            limit = (self.clock() if now is None else now) + LEARN_AHEAD_SECONDS
+            self._due_reviews = sum(1 for state in self.states.values() if state[3] <= limit)
+        return self._due_reviews + min(len(self._new), max(0, self.new_limit - self.new_served))
+
+    def next_question(self, now=None):
+        """Vrátí splatnou otázku, jinak novou, jinak otázku splatnou v horizontu
+        LEARN_AHEAD_SECONDS; None, pokud pro teď není co opakovat.
+
+        Otázky „dopředu“ přijdou na řadu až nakonec – jinak by se chybně
+        zodpovězená otázka (splatná za RELEARN_SECONDS) vrátila hned.
+        """
+        now = self.clock() if now is None else now
+        top = self._top()
+        if top is not None and top[0] <= now:
+            return self.by_id[top[1]]
+        if self._new and self.new_served < self.new_limit:
+            return self.by_id[self._new[0]]
+        if top is not None and top[0] <= now + LEARN_AHEAD_SECONDS:
+            return self.by_id[top[1]]
+        return None
+
+    def review(self, question_id, correct, now=None):
+        """Zapíše výsledek a otázku přeplánuje. Vrací nový stav (k uložení)."""
+        now = self.clock() if now is None else now
+        str_id = str(question_id)
+        old = self.states.get(str_id)
+        if old is None:
+            if self._new and self._new[0] == str_id:
+                self._new.popleft()
+            else:
+                self._new.remove(str_id)
+            self.new_served += 1
+            self.states[str_id] = new_state()
+        state = review_state(self.states[str_id], correct, now)
+        self.states[str_id] = state
+        heapq.heappush(self._heap, (state[3], str_id))
+        if self._due_reviews is not None:
+            limit = now + LEARN_AHEAD_SECONDS
+            self._due_reviews += (state[3] <= limit) - (old is not None and old[3] <= limit)
+        return state
@@ -0,0 +1,73 @@
+# search.py
+
+import re
+import unicodedata
+from bisect import bisect_left
+
+from data import SEARCH_CACHE_SUFFIX, load_cached
+
+TOKEN_RE = re.compile(r"\w+")
+# Kratší poslední slovo se nebere jako prefix (jinak by "a" sjednotilo půl slovníku)
+MIN_PREFIX = 2
+
+def normalize(text):
+    """Malá písmena bez diakritiky ("Účetnictví" -> "ucetnictvi")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+def _question_text(q):
+    parts = [q.text]
+    parts.extend(str(v) for v in q.option_texts)
+    if q.explanation:
+        parts.append(q.explanation)
+    return " ".join(parts)
+
+class SearchIndex:
+    """Invertovaný index nad textem otázek, možností a vysvětlení.
+
+    Hledá se bez ohledu na diakritiku a velikost písmen. Všechna slova dotazu
+    musí být v otázce; poslední slovo stačí jako prefix (hledání během psaní).
+    Výsledkem jsou pozice otázek v bance, seřazené.
+    """
+    def __init__(self, questions):
+        postings = {}
+        for pos, q in enumerate(questions):
+            for token in set(tokenize(_question_text(q))):
+                postings.setdefault(token, []).append(pos)
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    def _prefix_positions(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        matches = set()
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.update(self.postings[token])
+        return matches
+
+    def search(self, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        *whole, last = tokens
+        # Nejdřív nejmenší seznamy, průnik se tak rychle zmenšuje
+        sets = sorted((self.postings.get(t, ()) for t in whole), key=len)
+        result = None
+        for positions in sets:
+            result = set(positions) if result is None else result.intersection(positions)
+            if not result:
+                return []
+        if len(last) < MIN_PREFIX:
+            prefixed = set(self.postings.get(last, ()))
+        else:
+            prefixed = self._prefix_positions(last)
+        result = prefixed if result is None else result & prefixed
+        return sorted(result)
+
+def load_search_index(filename, questions):
+    """Index pro banku filename; sestaví se jednou a uloží do cache vedle banky."""
+    return load_cached(filename, SEARCH_CACHE_SUFFIX, lambda: SearchIndex(questions))
@@ -0,0 +1,478 @@
+# server.py
+#
+# Režim serveru pro více uživatelů v lokální síti (třída, jeden počítač).
+# Použití: python app/server.py [--host 0.0.0.0] [--port 8080] [--db server.sqlite3]
+#
+# Jen standardní knihovna: asyncio HTTP/1.1 s keep-alive, JSON API a malá
+# HTML stránka. Banka otázek a vyhledávací index se načtou jednou a sdílí je
+# všechna spojení; vyhodnocení odpovědí dělá stejný QuizEngine jako desktopová
+# aplikace. Statistiky a rozpracované testy jsou v SQLite po uživatelích.
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import random
+import sqlite3
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from data import SERVER_DB_FILE, load_questions_from_json
+from question_bank import QuestionBank
+from search import load_search_index
+from quiz_engine import QuizEngine, resolve_session
+
+DB_POOL_SIZE = 4
+MAX_BODY = 64 * 1024
+# Zápisy se sbírají a commitují po dávkách – jedna transakce na kolo smyčky zapisovače
+WRITE_BATCH = 500
+
+class ServerDB:
+    """SQLite ve WAL: jedno zapisovací spojení s dávkováním, pool spojení pro čtení."""
+
+    def __init__(self, filename=SERVER_DB_FILE, pool_size=DB_POOL_SIZE):
+        self.filename = filename
+        self.writer = self._connect()
+        with self.writer:
+            self.writer.executescript("""
+                CREATE TABLE IF NOT EXISTS user_stats (
+                    user TEXT NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    wrong INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user, question_id)
+                );
+                CREATE TABLE IF NOT EXISTS user_attempts (
+                    id INTEGER PRIMARY KEY,
+                    user TEXT NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    ts REAL NOT NULL,
+                    correct INTEGER NOT NULL,
+                    duration REAL NOT NULL DEFAULT 0,
+                    kolo INTEGER NOT NULL DEFAULT 1
+                );
+                CREATE INDEX IF NOT EXISTS user_attempts_user ON user_attempts(user, ts);
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    user TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated REAL NOT NULL
+                );
+            """)
+        self.pool = queue.Queue()
+        for _ in range(pool_size):
+            self.pool.put(self._connect())
+        self.executor = ThreadPoolExecutor(max_workers=pool_size + 1)
+        self._pending_attempts = []
+        # Rozpracované testy: platí jen poslední stav (None = smazat)
+        self._pending_sessions = {}
+        self._wakeup = asyncio.Event()
+        # Zapisovací spojení smí v jednu chvíli používat jen jeden _commit
+        self._write_lock = asyncio.Lock()
+        self._writer_task = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        # Pod zámkem se smyčka zapisovače nezruší uprostřed běžícího commitu
+        async with self._write_lock:
+            if self._writer_task is not None:
+                self._writer_task.cancel()
+                try:
+                    await self._writer_task
+                except asyncio.CancelledError:
+                    pass
+            await self._flush_pending()
+        self.executor.shutdown()
+
+    # Zápisy (jen ze smyčky událostí, do DB jdou dávkově)
+
+    def record_answer(self, user, question_id, correct, duration=0.0, kolo=1):
+        self._pending_attempts.append((user, int(question_id), time.time(), int(correct), duration, kolo))
+        self._wakeup.set()
+
+    def save_session(self, user, data):
+        self._pending_sessions[user] = data
+        self._wakeup.set()
+
+    async def _write_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self):
+        async with self._write_lock:
+            await self._flush_pending()
+
+    async def _flush_pending(self):
+        while self._pending_attempts or self._pending_sessions:
+            attempts = self._pending_attempts[:WRITE_BATCH]
+            del self._pending_attempts[:WRITE_BATCH]
+            sessions, self._pending_sessions = self._pending_sessions, {}
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._commit, attempts, sessions)
+
+    def _commit(self, attempts, sessions):
+        now = time.time()
+        with self.writer:
+            self.writer.executemany(
+                """INSERT INTO user_stats (user, question_id, total, correct, wrong) VALUES (?, ?, 1, ?, ?)
+                   ON CONFLICT(user, question_id) DO UPDATE SET
+                       total = total + 1,
+                       correct = correct + excluded.correct,
+                       wrong = wrong + excluded.wrong""",
+                [(user, qid, correct, 1 - correct) for user, qid, _, correct, _, _ in attempts],
+            )
+            self.writer.executemany(
+                "INSERT INTO user_attempts (user, question_id, ts, correct, duration, kolo) VALUES (?, ?, ?, ?, ?, ?)",
+                attempts,
+            )
+            self.writer.executemany(
+                "DELETE FROM user_sessions WHERE user = ?",
+                [(user,) for user, data in sessions.items() if data is None],
+            )
+            self.writer.executemany(
+                "INSERT OR REPLACE INTO user_sessions (user, data, updated) VALUES (?, ?, ?)",
+                [(user, json.dumps(data), now) for user, data in sessions.items() if data is not None],
+            )
+
+    # Čtení (pool spojení v executoru)
+
+    async def _read(self, sql, params):
+        def run():
+            conn = self.pool.get()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                self.pool.put(conn)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    async def load_session(self, user):
+        if user in self._pending_sessions:
+            return self._pending_sessions[user]
+        rows = await self._read("SELECT data FROM user_sessions WHERE user = ?", (user,))
+        return json.loads(rows[0][0]) if rows else None
+
+    async def user_stats(self, user):
+        await self._flush()
+        rows = await self._read(
+            "SELECT question_id, total, correct, wrong FROM user_stats WHERE user = ?", (user,)
+        )
+        return {str(qid): {"total": t, "correct": c, "wrong": w} for qid, t, c, w in rows}
+
+class UserStats:
+    """Adaptér s rozhraním StatsWriter.record_answer pro QuizEngine jednoho uživatele."""
+
+    def __init__(self, db, user):
+        self.db = db
+        self.user = user
+
+    def record_answer(self, question_id, correct, duration=0.0, kolo=1):
+        self.db.record_answer(self.user, question_id, correct, duration, kolo)
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class QuizServer:
+    def __init__(self, bank, db):
+        self.bank = bank
+        self.db = db
+        # Aktivní testy v paměti; při prvním požadavku se obnoví z DB
+        self.engines = {}
+        # Uživatelé, kteří už na aktuální otázku odpověděli (dvojí odeslání se nepočítá)
+        self.answered = set()
+
+    # Pomocné funkce
+
+    def _user(self, params):
+        user = str(params.get("user", "")).strip()
+        if not user or len(user) > 64:
+            raise HttpError(400, "Chybí jméno uživatele.")
+        return user
+
+    async def _engine(self, user):
+        engine = self.engines.get(user)
+        if engine is None:
+            data = await self.db.load_session(user)
+            if data is None:
+                raise HttpError(409, "Uživatel nemá rozpracovaný test.")
+            data = resolve_session(data, self.bank)
+            if not data["question_list"]:
+                raise HttpError(409, "Uložený test neodpovídá bance otázek.")
+            engine = QuizEngine(data["all_questions"], UserStats(self.db, user), resume_data=data)
+            self.engines[user] = engine
+        return engine
+
+    def _question_payload(self, engine):
+        q = engine.current
+        payload = {
+            "id": q.id,
+            "type": q.type,
+            "question": q.text,
+            "options": engine.current_options(),
+            "index": engine.question_index + 1,
+            "total": len(engine.question_list),
+            "kolo": engine.kolo,
+            "mode": engine.mode,
+            "score": engine.score,
+        }
+        if q.table is not None:
+            payload["table"] = q.table
+        return payload
+
+    # Endpointy
+
+    async def start(self, params):
+        user = self._user(params)
+        questions = self.bank.filter(
+            types=[params["type"]] if params.get("type") in ("theoretical", "practical") else None,
+            tags=[params["tag"]] if params.get("tag") else None,
+        )
+        if params.get("q"):
+            hits = set(q.id for q in self.bank.search(params["q"]) or ())
+            questions = [q for q in questions if q.id in hits]
+        if not questions:
+            raise HttpError(400, "Výběru neodpovídá žádná otázka.")
+        count = params.get("count")
+        if count:
+            try:
+                count = max(1, int(count))
+            except (TypeError, ValueError):
+                raise HttpError(400, "Neplatný počet otázek.")
+            if count < len(questions):
+                questions = random.sample(questions, count)
+        engine = QuizEngine(questions, UserStats(self.db, user))
+        self.engines[user] = engine
+        self.answered.discard(user)
+        self.db.save_session(user, engine.session_data())
+        return {"question": self._question_payload(engine)}
+
+    async def question(self, params):
+        engine = await self._engine(self._user(params))
+        return {"question": self._question_payload(engine)}
+
+    async def answer(self, params):
+        user = self._user(params)
+        engine = await self._engine(user)
+        selected = params.get("answers")
+        if not isinstance(selected, list):
+            raise HttpError(400, "Odpověď musí být seznam klíčů možností.")
+        q = engine.current
+        if params.get("id") is not None:
+            # Z query stringu přijde ID jako text
+            try:
+                qid = int(params["id"])
+            except (TypeError, ValueError):
+                raise HttpError(400, "Neplatné ID otázky.")
+            if qid != q.id:
+                raise HttpError(409, "Odpověď nepatří k aktuální otázce.")
+        try:
+            duration = float(params.get("duration") or 0.0)
+        except (TypeError, ValueError):
+            raise HttpError(400, "Neplatná délka odpovědi.")
+        mask = q.keys_mask({str(k) for k in selected})
+        if user in self.answered:
+            raise HttpError(409, "Na tuto otázku už byla odpověď odeslána.")
+        # Označí se až po vyhodnocení, jinak by chybný požadavek otázku zablokoval
+        # (mezi kontrolou a označením není await, souběžný požadavek se sem nedostane)
+        correct = engine.answer(mask, duration)
+        self.answered.add(user)
+        self.db.save_session(user, engine.session_data())
+        return {
+            "correct": correct,
+            "answer": list(q.answer),
+            "explanation": q.explanation,
+            "score": engine.score,
+        }
+
+    async def next(self, params):
+        user = self._user(params)
+        engine = await self._engine(user)
+        # Stejně jako v desktopové aplikaci nejde otázku přeskočit bez odpovědi
+        if user not in self.answered:
+            raise HttpError(409, "Nejdřív odpověz na aktuální otázku.")
+        self.answered.discard(user)
+        step = engine.advance()
+        if step == "finished":
+            del self.engines[user]
+            self.db.save_session(user, None)
+            return {"step": step, "score": engine.score}
+        self.db.save_session(user, engine.session_data())
+        return {"step": step, "question": self._question_payload(engine)}
+
+    async def stats(self, params):
+        user = self._user(params)
+        stats = await self.db.user_stats(user)
+        total = sum(s["total"] for s in stats.values())
+        correct = sum(s["correct"] for s in stats.values())
+        return {"total": total, "correct": correct, "wrong": total - correct, "questions": stats}
+
+    ROUTES = {
+        ("POST", "/api/start"): start,
+        ("GET", "/api/question"): question,
+        ("POST", "/api/answer"): answer,
+        ("POST", "/api/next"): next,
+        ("GET", "/api/stats"): stats,
+    }
+
+    # HTTP
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Bez platné délky nejde najít konec těla, spojení se musí zavřít
+                    await self._respond(writer, 400, {"error": "Neplatná hlavička Content-Length."}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": STATUS_TEXT[413]}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/" and method == "GET":
+            return 200, INDEX_HTML
+        handler = self.ROUTES.get((method, url.path))
+        if handler is None:
+            return 404, {"error": STATUS_TEXT[404]}
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if body:
+                try:
+                    params.update(json.loads(body))
+                except (ValueError, TypeError):
+                    raise HttpError(400, "Tělo požadavku není platný JSON objekt.")
+            return 200, await handler(self, params)
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"{STATUS_TEXT[400]}: {e}"}
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            return 500, {"error": STATUS_TEXT[500]}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+INDEX_HTML = """<!doctype html>
+<html lang="cs"><head><meta charset="utf-8"><title>Testovací program</title>
+<style>body{font-family:Arial,sans-serif;max-width:720px;margin:2em auto}label{display:block;margin:.4em 0}
+.ok{color:green}.bad{color:red}</style></head><body>
+<h2>Testovací program</h2>
+<p><input id="user" placeholder="Jméno"> <select id="type"><option value="">Všechny</option>
+<option value="theoretical">Teoretické</option><option value="practical">Praktické</option></select>
+<input id="count" size="5" placeholder="Počet"> <button onclick="start()">Začít</button>
+<button onclick="call('GET','/api/question').then(show)">Pokračovat</button></p>
+<div id="quiz"></div><p id="feedback"></p><button id="btn" hidden></button>
+<script>
+let q=null,shown=0;const $=id=>document.getElementById(id);
+async function call(method,path,body){const u=encodeURIComponent($('user').value);
+ const r=await fetch(path+'?user='+u,{method,body:body&&JSON.stringify(body)});const d=await r.json();
+ if(!r.ok){$('feedback').textContent=d.error;throw d}return d}
+function start(){call('POST','/api/start',{type:$('type').value,count:$('count').value}).then(show)}
+function show(d){q=d.question;shown=Date.now();$('feedback').textContent='';
+ $('quiz').innerHTML='<p>Otázka '+q.index+' / '+q.total+(q.kolo>1?' (opakovací kolo '+(q.kolo-1)+')':'')+'</p><h3></h3>'+
+  q.options.map(([k,t])=>'<label><input type="checkbox" name="o" value="'+k+'"> <span></span></label>').join('');
+ $('quiz').querySelector('h3').textContent=q.question;
+ $('quiz').querySelectorAll('span').forEach((s,i)=>s.textContent=q.options[i][1]);
+ $('btn').hidden=false;$('btn').textContent='Odpovědět';$('btn').onclick=answer}
+function answer(){const sel=[...document.querySelectorAll('input[name=o]:checked')].map(e=>e.value);
+ call('POST','/api/answer',{id:q.id,answers:sel,duration:(Date.now()-shown)/1000}).then(d=>{
+  $('feedback').className=d.correct?'ok':'bad';
+  $('feedback').textContent=(d.correct?'Správně!':'Špatně! Správně: '+d.answer.join(', '))+(d.explanation?' – '+d.explanation:'');
+  $('btn').textContent='Další';$('btn').onclick=next})}
+function next(){call('POST','/api/next').then(d=>{if(d.step==='finished'){$('quiz').innerHTML='';
+ $('btn').hidden=true;$('feedback').className='';$('feedback').textContent='Hotovo! Skóre: '+d.score}else show(d)})}
+</script></body></html>
+"""
+
+def load_bank(filename):
+    questions = load_questions_from_json(filename)
+    if not questions:
+        sys.exit("Nebyl nalezen platný JSON se zadáním otázek!")
+    return QuestionBank(questions, load_search_index(filename, questions))
+
+async def serve(host, port, bank, db_file):
+    db = ServerDB(db_file)
+    db.start()
+    server = QuizServer(bank, db)
+    # Velký backlog: celá třída se typicky připojí najednou
+    listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    print(f"Server běží na http://{host}:{port}/ ({len(bank)} otázek)", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Testovací program jako server pro více uživatelů v síti.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=SERVER_DB_FILE)
+    parser.add_argument("--questions", default=os.environ.get("QUIZ_QUESTIONS_FILE", "merged_questions.json"))
+    args = parser.parse_args(argv)
+    bank = load_bank(args.questions)
+    try:
+        asyncio.run(serve(args.host, args.port, bank, args.db))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,14 @@
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
+from itertools import islice
+from operator import itemgetter
 import string
 
-def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_window_ref):
-    stats = load_stats()
+STATS_PAGE_SIZE = 200
+STATS_LOAD_CHUNK = 5000
+
+def show_stats_window(root, bank, stats_writer, show_stats_window_ref):
     stats_win = tk.Toplevel(root)
     stats_win.title("Statistiky otázek")
     stats_win.geometry("980x600")
@@ -17,19 +21,11 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
     bottom_panel = tk.Frame(stats_win)
     bottom_panel.pack(side="bottom", fill="x")
 
-    id_to_question = {str(q.get("id")): q for q in ALL_QUESTIONS}
-    total, correct, wrong = 0, 0, 0
-
     columns = ("ID", "Otázka", "Celkem", "Správně", "Špatně", "Úspěšnost")
     tree = ttk.Treeview(main_frame, columns=columns, show="headings", selectmode="browse")
     tree.pack(fill="both", expand=True)
-    
-    tree.heading("ID", text="ID")
+
     tree.heading("Otázka", text="Otázka (zkrácená)")
-    tree.heading("Celkem", text="Celkem")
-    tree.heading("Správně", text="Správně")
-    tree.heading("Špatně", text="Špatně")
-    tree.heading("Úspěšnost", text="Úspěšnost")
     tree.column("ID", width=60, anchor="center")
     tree.column("Otázka", width=550, anchor="w")
     tree.column("Celkem", width=70, anchor="center")
@@ -37,56 +33,141 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
     tree.column("Špatně", width=70, anchor="center")
     tree.column("Úspěšnost", width=100, anchor="center")
 
-    for qid in sorted(stats, key=lambda x: int(x)):
-        stat = stats[qid]
-        q_text = id_to_question.get(qid, {}).get("question", "??")
-        q_short = (q_text[:65] + "...") if len(q_text) > 65 else q_text
-        percent = 0
-        if stat["total"] > 0:
-            percent = 100 * stat["correct"] / stat["total"]
-        total += stat["total"]
-        correct += stat["correct"]
-        wrong += stat["wrong"]
-        tree.insert("", "end", values=(qid, q_short, stat["total"], stat["correct"], stat["wrong"], f"{percent:.1f} %"))
-
-    total_percent = 100 * correct / total if total > 0 else 0
-    summary_text = (
-        f"Celkem odpovědí: {total}\n"
-        f"Správně: {correct}\n"
-        f"Špatně: {wrong}\n"
-        f"Průměrná úspěšnost: {total_percent:.1f} %"
-    )
-    summary_label = tk.Label(bottom_panel, text=summary_text, font=("Arial", 12, "bold"), fg="blue", anchor="w", justify="left")
+    # Tabulka je stránkovaná: v Treeview je vždy jen jedna stránka řádků.
+    # Řádky jsou n-tice (id, text, celkem, správně, špatně, úspěšnost) a slouží
+    # zároveň jako předpočítané klíče pro řazení.
+    rows = []
+    # filter: None, nebo množina ID z fulltextového hledání; visible: řádky po filtru
+    view = {"page": 0, "sort_col": 0, "reverse": False, "loaded": False, "filter": None, "visible": rows}
+
+    filter_frame = tk.Frame(main_frame)
+    filter_frame.pack(fill="x", before=tree)
+    tk.Label(filter_frame, text="Hledat:", font=("Arial", 10)).pack(side="left", padx=4)
+    filter_var = tk.StringVar()
+    tk.Entry(filter_frame, textvariable=filter_var, width=40).pack(side="left", pady=2)
+
+    pager = tk.Frame(main_frame)
+    pager.pack(fill="x")
+    page_label = tk.Label(pager, font=("Arial", 10))
+
+    def refresh_visible():
+        ids = view["filter"]
+        view["visible"] = rows if ids is None else [row for row in rows if row[0] in ids]
+
+    def page_count():
+        return max(1, (len(view["visible"]) + STATS_PAGE_SIZE - 1) // STATS_PAGE_SIZE)
+
+    def render_page():
+        tree.delete(*tree.get_children())
+        view["page"] = min(view["page"], page_count() - 1)
+        start = view["page"] * STATS_PAGE_SIZE
+        for qid, q_short, total_ans, correct_ans, wrong_ans, percent in view["visible"][start:start + STATS_PAGE_SIZE]:
+            tree.insert("", "end", values=(qid, q_short, total_ans, correct_ans, wrong_ans, f"{percent:.1f} %"))
+        loading = "" if view["loaded"] else " (načítám…)"
+        page_label.config(text=f"Strana {view['page'] + 1} / {page_count()} – {len(view['visible'])} otázek{loading}")
+
+    def change_page(step):
+        view["page"] = max(0, min(view["page"] + step, page_count() - 1))
+        render_page()
+
+    def sort_by(col_idx):
+        if view["sort_col"] == col_idx:
+            view["reverse"] = not view["reverse"]
+        else:
+            view["sort_col"], view["reverse"] = col_idx, False
+        rows.sort(key=itemgetter(col_idx), reverse=view["reverse"])
+        refresh_visible()
+        view["page"] = 0
+        render_page()
+
+    def on_filter(*_):
+        matches = bank.search(filter_var.get())
+        view["filter"] = None if matches is None else {q.id for q in matches}
+        refresh_visible()
+        view["page"] = 0
+        render_page()
+
+    filter_var.trace_add("write", on_filter)
+
+    for idx, col in enumerate(columns):
+        if col != "Otázka":
+            tree.heading(col, text=col, command=lambda i=idx: sort_by(i))
+    tree.heading("Otázka", command=lambda: sort_by(1))
+
+    tk.Button(pager, text="◀", command=lambda: change_page(-1)).pack(side="left", padx=4)
+    page_label.pack(side="left", padx=4)
+    tk.Button(pager, text="▶", command=lambda: change_page(1)).pack(side="left", padx=4)
+
+    # Statistiky se načítají v I/O vlákně (viz on_summary níže)
+    stats = {}
+    pending = iter(())
+
+    def load_chunk():
+        # Data se připravují po dávkách přes after(), okno je tak hned použitelné
+        if not stats_win.winfo_exists():
+            return
+        for qid, stat in islice(pending, STATS_LOAD_CHUNK):
+            q = bank.get(qid)
+            q_text = q.text if q else "??"
+            q_short = (q_text[:65] + "...") if len(q_text) > 65 else q_text
+            percent = 100 * stat["correct"] / stat["total"] if stat["total"] > 0 else 0
+            rows.append((int(qid), q_short, stat["total"], stat["correct"], stat["wrong"], percent))
+        if len(rows) < len(stats):
+            if len(rows) <= STATS_LOAD_CHUNK:
+                refresh_visible()
+                render_page()
+            stats_win.after(1, load_chunk)
+            return
+        view["loaded"] = True
+        rows.sort(key=itemgetter(view["sort_col"]), reverse=view["reverse"])
+        refresh_visible()
+        render_page()
+
+    summary_label = tk.Label(bottom_panel, text="Načítám statistiky…", font=("Arial", 12, "bold"), fg="blue", anchor="w", justify="left")
     summary_label.pack(anchor="w", padx=10, pady=2)
+    worst_label = tk.Label(bottom_panel, text="", font=("Arial", 11), fg="black", anchor="w", justify="left")
+    worst_label.pack(anchor="w", padx=10, pady=(2, 2))
 
-    worst_questions = []
-    for qid in stats:
-        stat = stats[qid]
-        total_ans = stat["total"]
-        correct_ans = stat["correct"]
-        if total_ans > 0:
+    def on_summary(summary):
+        nonlocal pending
+        if not stats_win.winfo_exists():
+            return
+        # Kromě čítačů otázek obsahuje stats i skalární hodnoty – ty už summary vynechává
+        stats.update(summary["stats"])
+        pending = iter(stats.items())
+        stats_win.after(1, load_chunk)
+
+        total, correct, wrong = summary["aggregates"]
+        total_percent = 100 * correct / total if total > 0 else 0
+        week_total, week_correct = summary["week"]
+        week_percent = 100 * week_correct / week_total if week_total > 0 else 0
+        summary_label.config(text=(
+            f"Celkem odpovědí: {total}\n"
+            f"Správně: {correct}\n"
+            f"Špatně: {wrong}\n"
+            f"Průměrná úspěšnost: {total_percent:.1f} %\n"
+            f"Posledních 7 dní: {week_total} odpovědí, úspěšnost {week_percent:.1f} %"
+        ))
+
+        worst_label_text = "Top 10 nejhorších otázek:\n"
+        for idx, (qid, difficulty, total_ans, correct_ans) in enumerate(summary["worst"], 1):
             success = 100 * correct_ans / total_ans
-            q_text = id_to_question.get(qid, {}).get("question", "??")
+            q = bank.get(qid)
+            q_text = q.text if q else "??"
             q_short = (q_text[:85] + "...") if len(q_text) > 85 else q_text
-            worst_questions.append((success, qid, q_short, total_ans))
-    worst_questions.sort()
+            worst_label_text += f"{idx}. [ID {qid}] {q_short} ({success:.1f} %, pokusy: {total_ans}, obtížnost: {difficulty:.2f})\n"
+        worst_label.config(text=worst_label_text)
 
-    top_n = 10
-    worst_label_text = "Top 10 nejhorších otázek:\n"
-    for idx, (success, qid, q_short, total_ans) in enumerate(worst_questions[:top_n], 1):
-        worst_label_text += f"{idx}. [ID {qid}] {q_short} ({success:.1f} %, pokusy: {total_ans})\n"
-
-    worst_label = tk.Label(bottom_panel, text=worst_label_text, font=("Arial", 11), fg="black", anchor="w", justify="left")
-    worst_label.pack(anchor="w", padx=10, pady=(2, 2))
+    stats_writer.request_summary(on_summary, days=7, k=10)
 
     btns = tk.Frame(bottom_panel)
     btns.pack(anchor="center", pady=7)
     def reset_stats():
         if messagebox.askyesno("Potvrdit reset", "Opravdu chceš vymazat všechny statistiky?"):
-            save_stats({})
+            stats_writer.save({})
             stats_win.destroy()
             # Rekurzivní volání (musí být referencované přes show_stats_window_ref kvůli cyklickému importu)
-            show_stats_window_ref(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_window_ref)
+            show_stats_window_ref(root, bank, stats_writer, show_stats_window_ref)
     btn_reset = tk.Button(btns, text="Resetovat statistiky", font=("Arial", 11), command=reset_stats)
     btn_reset.pack(side="left", padx=10)
     btn_close = tk.Button(btns, text="Zavřít", font=("Arial", 11), command=stats_win.destroy)
@@ -98,7 +179,7 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
             return
         values = tree.item(item_id, "values")
         qid = values[0]
-        q = id_to_question.get(str(qid))
+        q = bank.get(str(qid))
         if not q:
             messagebox.showerror("Chyba", f"Otázka s ID {qid} nebyla nalezena.")
             return
@@ -107,11 +188,11 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
         detail_win.title(f"Otázka {qid} – Detail")
         detail_win.geometry("950x500")
 
-        lbl_question = tk.Label(detail_win, text=q["question"], font=("Arial", 14), wraplength=900, justify="left")
+        lbl_question = tk.Label(detail_win, text=q.text, font=("Arial", 14), wraplength=900, justify="left")
         lbl_question.pack(pady=15)
 
-        if "table" in q:
-            table = q["table"]
+        if q.table is not None:
+            table = q.table
             table_frame = tk.Frame(detail_win)
             table_frame.pack(pady=5)
             for col, val in enumerate(table["header"]):
@@ -123,9 +204,9 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
                     l.grid(row=row_idx, column=col, sticky="nsew")
 
         option_keys = list(string.ascii_lowercase)
-        original_options = list(q["options"].items())
-        for idx, (orig_key, value) in enumerate(original_options):
-            is_correct = orig_key in q["answer"]
+        answer = q.answer
+        for idx, (orig_key, value) in enumerate(q.options):
+            is_correct = orig_key in answer
             mark = "✅" if is_correct else ""
             color = "green" if is_correct else "black"
             frame = tk.Frame(detail_win)
@@ -141,10 +222,10 @@ def show_stats_window(root, ALL_QUESTIONS, load_stats, save_stats, show_stats_wi
             )
             lbl.pack(side="left", fill="x", expand=True, anchor="w")
 
-        if q.get("explanation"):
+        if q.explanation:
             explanation_label = tk.Label(
                 detail_win,
-                text=f"Vysvětlení: {q['explanation']}",
+                text=f"Vysvětlení: {q.explanation}",
                 font=("Arial", 11, "italic"),
                 fg="gray20",
                 wraplength=900,
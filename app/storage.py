@@ -0,0 +1,547 @@
+# storage.py
+
+import json
+import os
+import sqlite3
+import time
+
+from data import (
+    STATS_FILE,
+    STATS_DB_FILE,
+    SCHEDULE_FILE,
+    STATS_BACKEND,
+    STATS_FLUSH_EVERY,
+    STATS_FLUSH_MS,
+    STATS_DURABILITY,
+    STATS_VERSION,
+    LEGACY_NODE_PREFIX,
+    STATS_LOCK_TIMEOUT,
+    load_stats,
+    load_stats_document,
+    flatten_stats,
+    max_counters,
+    node_device,
+    device_id,
+    atomic_write_json,
+)
+from filelock import FileLock
+from io_worker import get_io_worker
+from history import AttemptLog
+from ranking import WorstQuestions
+
+class JsonStatsStorage:
+    """Statistiky ve stats.json, bezpečné pro více současně běžících instancí.
+
+    Každá instance má v souboru vlastní uzel čítačů (G-counter) a drží si jeho
+    absolutní hodnoty. Zápis pod krátkým zámkem soubor znovu načte, do svého
+    uzlu dá maximum se souborem plus nové přírůstky a ostatní uzly nechá být,
+    takže se souběžné změny nepřepíšou. Když zámek nejde získat, přírůstky
+    počkají na další zápis.
+    """
+    def __init__(self, filename=STATS_FILE, durability=STATS_DURABILITY, schedule_filename=SCHEDULE_FILE,
+                 lock_timeout=STATS_LOCK_TIMEOUT):
+        self.filename = filename
+        self.durability = durability
+        self.schedule_filename = schedule_filename
+        self.lock = FileLock(filename + ".lock", timeout=lock_timeout)
+        self.node = None
+        self._node_lease = None
+        # Čas posledního resetu tohoto zařízení, od kterého vlastní uzel počítá
+        self._since = None
+        # Absolutní čítače vlastního uzlu a přírůstky, které ještě nejsou v souboru
+        self._own = {}
+        self._unsaved = {}
+        self._values = {}
+        self._stats = None
+        self._stamp = None
+        self._schedule = None
+        self._schedule_unsaved = {}
+
+    def _claim_node(self):
+        """Uzel "<zařízení>-<n>": n je první slot, který nedrží jiná běžící instance."""
+        device = device_id()
+        n = 0
+        while True:
+            lease = FileLock(f"{self.filename}.{device}-{n}.node")
+            if lease.acquire(blocking=False):
+                self.node = f"{device}-{n}"
+                self._node_lease = lease
+                return
+            n += 1
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self):
+        # Soubor se znovu čte, jen když ho mezitím změnila jiná instance
+        stamp = self._file_stamp()
+        if self._stats is None or stamp != self._stamp:
+            self._stats = flatten_stats(load_stats_document(self.filename))
+            self._stamp = stamp
+        if not self._unsaved and not self._values:
+            return self._stats
+        stats = {k: dict(v) if isinstance(v, dict) else v for k, v in self._stats.items()}
+        for str_id, (total, correct, wrong) in self._unsaved.items():
+            stat = stats.setdefault(str_id, {"total": 0, "correct": 0, "wrong": 0})
+            stat["total"] += total
+            stat["correct"] += correct
+            stat["wrong"] += wrong
+        stats.update(self._values)
+        return stats
+
+    def commit(self, deltas, values, attempts):
+        for str_id, (total, correct, wrong) in deltas.items():
+            pending = self._unsaved.setdefault(str_id, [0, 0, 0])
+            pending[0] += total
+            pending[1] += correct
+            pending[2] += wrong
+        self._values.update(values)
+        self._write()
+
+    def _write(self):
+        """Promítne vlastní uzel do souboru; vrací False, pokud je zámek obsazený."""
+        if self.node is None:
+            self._claim_node()
+        if not self.lock.acquire():
+            return False
+        try:
+            doc = load_stats_document(self.filename)
+            reset_at = doc["resets"].get(node_device(self.node), 0)
+            if self._since is None or reset_at > self._since:
+                # Statistiky tohoto zařízení mezitím někdo resetoval: starý stav uzlu neplatí
+                if self._since is not None:
+                    self._own = {}
+                self._since = reset_at
+            stored = {}
+            if doc["node_since"].get(self.node, 0) >= self._since:
+                stored = doc["counters"].get(self.node, {})
+            own = max_counters(stored, self._own)
+            for str_id, delta in self._unsaved.items():
+                counts = own.get(str_id, [0, 0, 0])
+                own[str_id] = [x + d for x, d in zip(counts, delta)]
+            if own:
+                doc["counters"][self.node] = own
+                doc["node_since"][self.node] = self._since
+            doc["values"].update(self._values)
+            now = time.time()
+            doc["values_ts"].update({key: now for key in self._values})
+            atomic_write_json(doc, self.filename, self.durability)
+            self._own = own
+            self._unsaved = {}
+            self._values = {}
+            self._stats = flatten_stats(doc)
+            self._stamp = self._file_stamp()
+            return True
+        finally:
+            self.lock.release()
+
+    def replace(self, stats):
+        """Přepíše statistiky tohoto zařízení (reset).
+
+        Uzly ostatních zařízení zůstanou – při synchronizaci by se stejně
+        vrátily; reset se do nich propíše jen přes čas v "resets". Importované
+        legacy uzly v lokálním souboru se resetují také.
+        """
+        if self.node is None:
+            self._claim_node()
+        device = node_device(self.node)
+        own = {str_id: [s["total"], s["correct"], s["wrong"]] for str_id, s in stats.items() if isinstance(s, dict)}
+        values = {k: v for k, v in stats.items() if not isinstance(v, dict)}
+        with self.lock:
+            doc = load_stats_document(self.filename)
+            # Nový reset musí být ostře pozdější než předchozí (i při posunu hodin)
+            now = max(time.time(), doc["resets"].get(device, 0) + 1e-6)
+            for node in list(doc["counters"]):
+                if node.startswith(LEGACY_NODE_PREFIX):
+                    doc["resets"][node] = now
+                elif node_device(node) != device:
+                    continue
+                del doc["counters"][node]
+                doc["node_since"].pop(node, None)
+            doc["resets"][device] = now
+            if own:
+                doc["counters"][self.node] = own
+                doc["node_since"][self.node] = now
+            doc["values"] = values
+            doc["values_ts"] = {key: now for key in values}
+            atomic_write_json(doc, self.filename, self.durability)
+        self._since = now
+        self._own = own
+        self._unsaved = {}
+        self._values = {}
+        self._stats = flatten_stats(doc)
+        self._stamp = self._file_stamp()
+
+    def aggregates(self):
+        total = correct = wrong = 0
+        for stat in self.load().values():
+            if isinstance(stat, dict):
+                total += stat["total"]
+                correct += stat["correct"]
+                wrong += stat["wrong"]
+        return total, correct, wrong
+
+    def load_schedule(self):
+        if self._schedule is None:
+            self._schedule = load_stats(self.schedule_filename)
+        return self._schedule
+
+    def commit_schedule(self, states):
+        # Stavy plánovače jsou po otázkách "poslední vyhrává"; soubor se pod
+        # zámkem znovu načte, aby se nepřepsaly otázky jiné instance
+        schedule = self.load_schedule()
+        schedule.update(states)
+        self._schedule_unsaved.update(states)
+        if not self.lock.acquire():
+            return
+        try:
+            schedule = load_stats(self.schedule_filename)
+            schedule.update(self._schedule_unsaved)
+            atomic_write_json(schedule, self.schedule_filename, self.durability)
+            self._schedule = schedule
+            self._schedule_unsaved = {}
+        finally:
+            self.lock.release()
+
+    def close(self):
+        if self._unsaved or self._values:
+            # Při ukončení se na zámek čeká bez limitu, ať se nic neztratí
+            self.lock.timeout = None
+            self._write()
+        if self._node_lease is not None:
+            self._node_lease.release()
+            self._node_lease = None
+
+class SqliteStatsStorage:
+    """Statistiky v SQLite (WAL): čítače po otázkách a jednotlivé pokusy.
+
+    Při prvním otevření se jednorázově naimportuje existující stats.json.
+    """
+    SYNCHRONOUS = {"none": "OFF", "file": "NORMAL", "full": "FULL"}
+
+    def __init__(self, filename=STATS_DB_FILE, json_filename=STATS_FILE, durability=STATS_DURABILITY):
+        self.filename = filename
+        # Spojení vzniká v hlavním vlákně, ale používá ho I/O worker
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={self.SYNCHRONOUS.get(durability, 'NORMAL')}")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS question_stats (
+                    question_id INTEGER PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    wrong INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS attempts (
+                    id INTEGER PRIMARY KEY,
+                    question_id INTEGER NOT NULL,
+                    ts REAL NOT NULL,
+                    correct INTEGER NOT NULL,
+                    duration REAL NOT NULL DEFAULT 0,
+                    kolo INTEGER NOT NULL DEFAULT 1
+                );
+                CREATE INDEX IF NOT EXISTS attempts_question ON attempts(question_id);
+                CREATE INDEX IF NOT EXISTS attempts_ts ON attempts(ts);
+                CREATE TABLE IF NOT EXISTS schedule (
+                    question_id INTEGER PRIMARY KEY,
+                    ease REAL NOT NULL,
+                    interval INTEGER NOT NULL,
+                    reps INTEGER NOT NULL,
+                    due REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS schedule_due ON schedule(due);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+        self._import_json(json_filename)
+
+    def _import_json(self, json_filename):
+        if self._get_meta("json_imported") or not os.path.exists(json_filename):
+            return
+        stats = load_stats(json_filename)
+        rows = [(int(qid), s["total"], s["correct"], s["wrong"])
+                for qid, s in stats.items() if isinstance(s, dict)]
+        values = {k: v for k, v in stats.items() if not isinstance(v, dict)}
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO question_stats (question_id, total, correct, wrong) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._set_meta_values(values)
+            self._set_meta_values({"json_imported": time.time()})
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta_values(self, values):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(k, json.dumps(v)) for k, v in values.items()],
+        )
+
+    def load(self):
+        stats = {
+            str(qid): {"total": total, "correct": correct, "wrong": wrong}
+            for qid, total, correct, wrong in self.conn.execute(
+                "SELECT question_id, total, correct, wrong FROM question_stats"
+            )
+        }
+        duration = self._get_meta("latest_duration")
+        if duration is not None:
+            stats["latest_duration"] = duration
+        return stats
+
+    def commit(self, deltas, values, attempts):
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO question_stats (question_id, total, correct, wrong) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(question_id) DO UPDATE SET
+                       total = total + excluded.total,
+                       correct = correct + excluded.correct,
+                       wrong = wrong + excluded.wrong""",
+                [(int(qid), t, c, w) for qid, (t, c, w) in deltas.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO attempts (question_id, ts, correct, duration, kolo) VALUES (?, ?, ?, ?, ?)",
+                [(int(qid), ts, int(correct), duration, kolo) for ts, qid, correct, duration, kolo in attempts],
+            )
+            self._set_meta_values(values)
+
+    def replace(self, stats):
+        with self.conn:
+            self.conn.execute("DELETE FROM question_stats")
+            self.conn.execute("DELETE FROM attempts")
+            self.conn.execute("DELETE FROM meta WHERE key != 'json_imported'")
+        deltas = {qid: (s["total"], s["correct"], s["wrong"]) for qid, s in stats.items() if isinstance(s, dict)}
+        values = {k: v for k, v in stats.items() if not isinstance(v, dict)}
+        self.commit(deltas, values, [])
+
+    def aggregates(self):
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(total), 0), COALESCE(SUM(correct), 0), COALESCE(SUM(wrong), 0) FROM question_stats"
+        ).fetchone()
+        return tuple(row)
+
+    def load_schedule(self):
+        return {
+            str(qid): [ease, interval, reps, due]
+            for qid, ease, interval, reps, due in self.conn.execute(
+                "SELECT question_id, ease, interval, reps, due FROM schedule"
+            )
+        }
+
+    def commit_schedule(self, states):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO schedule (question_id, ease, interval, reps, due) VALUES (?, ?, ?, ?, ?)",
+                [(int(qid), *state) for qid, state in states.items()],
+            )
+
+    def close(self):
+        self.conn.close()
+
+def open_stats_storage(backend=STATS_BACKEND):
+    if backend == "sqlite":
+        return SqliteStatsStorage()
+    if backend == "json":
+        return JsonStatsStorage()
+    raise ValueError(f"Neznámé úložiště statistik: {backend}")
+
+class StatsWriter:
+    """Sbírá změny statistik v paměti a zapisuje je do úložiště odloženě.
+
+    Zápis proběhne po STATS_FLUSH_EVERY odpovědích, po STATS_FLUSH_MS přes
+    root.after, při návratu do menu, na konci testu a při zavření okna.
+    S workerem (IOWorker) veškerý přístup k úložišti a historii běží v jeho
+    vlákně: zápisy se jen zařadí do fronty, čtení počká na dřívější zápisy.
+    """
+    def __init__(self, storage, history=None, flush_every=STATS_FLUSH_EVERY, flush_ms=STATS_FLUSH_MS,
+                 worker=None):
+        self.storage = storage
+        self.history = history
+        self.worker = worker
+        self.flush_every = flush_every
+        self.flush_ms = flush_ms
+        self._deltas = {}
+        self._values = {}
+        self._attempts = []
+        self._schedule = {}
+        self._dirty = 0
+        self._root = None
+        self._after_id = None
+        self._worst = None
+        # Zvyšuje se s každou změnou statistik (pro invalidaci odvozených cache)
+        self.version = 0
+
+    def attach(self, root):
+        """Napojí writer (a jeho I/O worker) na Tk smyčku kvůli časovanému zápisu a callbackům."""
+        self._root = root
+        if self.worker is not None:
+            self.worker.attach(root)
+
+    def _call(self, fn, *args):
+        """Synchronní čtení – ve vlákně workeru, po všech dříve zařazených zápisech."""
+        if self.worker is None:
+            return fn(*args)
+        return self.worker.call(fn, *args)
+
+    def _submit(self, fn, *args, callback=None):
+        if self.worker is None:
+            result = fn(*args)
+            if callback is not None:
+                callback(result)
+        else:
+            self.worker.submit(fn, *args, callback=callback)
+
+    def load(self):
+        self.flush()
+        return self._call(self.storage.load)
+
+    def save(self, stats):
+        self._deltas.clear()
+        self._values.clear()
+        self._attempts.clear()
+        self._dirty = 0
+        self._worst = None
+        self.version += 1
+        self._submit(self._replace, stats)
+
+    def _replace(self, stats):
+        self.storage.replace(stats)
+        if not stats and self.history is not None:
+            self.history.clear()
+
+    def aggregates(self):
+        self.flush()
+        return self._call(self.storage.aggregates)
+
+    def _accuracy_last_days(self, days):
+        if self.history is None:
+            return 0, 0
+        return self.history.accuracy_last_days(days)
+
+    def accuracy_last_days(self, days):
+        """Vrací (počet pokusů, počet správných) za posledních days dní z binární historie."""
+        self.flush()
+        return self._call(self._accuracy_last_days, days)
+
+    def _last_seen(self, days):
+        if self.history is None:
+            return {}
+        return self.history.last_seen_since(time.time() - days * 86400)
+
+    def request_weak_spot_data(self, callback, days):
+        """Načte na pozadí statistiky a časy posledních pokusů za days dní;
+        callback(stats, last_seen) se zavolá v Tk vlákně."""
+        self.flush()
+
+        def build():
+            return self.storage.load(), self._last_seen(days)
+
+        self._submit(build, callback=lambda result: callback(*result))
+
+    def request_summary(self, callback, days=7, k=10):
+        """Načte data pro okno statistik na pozadí; callback(summary) dostane dict
+        se stats (jen čítače otázek), aggregates, week (pokusy, správně) a worst."""
+        self.flush()
+        version = self.version
+
+        def build():
+            stats = self.storage.load()
+            worst = self._worst if version == self.version and self._worst is not None else WorstQuestions(stats)
+            return {
+                "stats": {qid: stat for qid, stat in stats.items() if isinstance(stat, dict)},
+                "aggregates": self.storage.aggregates(),
+                "week": self._accuracy_last_days(days),
+                "worst": worst,
+            }
+
+        def done(summary):
+            # Pořadí se převezme, jen pokud mezitím nepřibyly další odpovědi
+            if self.version == version:
+                self._worst = summary["worst"]
+            summary["worst"] = summary["worst"].top(k)
+            callback(summary)
+
+        self._submit(build, callback=done)
+
+    def record_answer(self, question_id, correct, duration=0.0, kolo=1):
+        str_id = str(question_id)
+        delta = self._deltas.setdefault(str_id, [0, 0, 0])
+        delta[0] += 1
+        delta[1 if correct else 2] += 1
+        self._attempts.append((time.time(), question_id, correct, duration, kolo))
+        self.version += 1
+        if self._worst is not None:
+            self._worst.update(str_id, correct)
+        self._mark_dirty()
+
+    def request_schedule(self, callback):
+        """Načte na pozadí stavy plánovače opakování; callback(states) v Tk vlákně."""
+        self.flush()
+        self._submit(self.storage.load_schedule, callback=callback)
+
+    def record_review(self, question_id, state):
+        """Uloží nový stav otázky v plánovači opakování (zapisuje se spolu se statistikami)."""
+        self._schedule[str(question_id)] = state
+        self._mark_dirty()
+
+    def set_value(self, key, value):
+        self._values[key] = value
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty += 1
+        if self._dirty >= self.flush_every:
+            self.flush()
+        elif self._root is not None and self._after_id is None:
+            self._after_id = self._root.after(self.flush_ms, self._on_timer)
+
+    def _on_timer(self):
+        self._after_id = None
+        self.flush()
+
+    def flush(self):
+        if self._after_id is not None and self._root is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        if self._dirty:
+            # Buffery se předají workeru celé a tady se začne s novými
+            self._submit(self._commit, self._deltas, self._values, self._attempts, self._schedule)
+            self._deltas = {}
+            self._values = {}
+            self._attempts = []
+            self._schedule = {}
+            self._dirty = 0
+
+    def _commit(self, deltas, values, attempts, schedule):
+        self.storage.commit(deltas, values, attempts)
+        if self.history is not None:
+            self.history.append(attempts)
+        if schedule:
+            self.storage.commit_schedule(schedule)
+
+    def close(self):
+        """Zapíše zbytek bufferu a uvolní úložiště (při zavření aplikace)."""
+        self.flush()
+        self._call(self.storage.close)
+
+_stats_writer = None
+
+def get_stats_writer():
+    """Vrací sdílený StatsWriter (jeden na proces) nad nakonfigurovaným úložištěm."""
+    global _stats_writer
+    if _stats_writer is None:
+        _stats_writer = StatsWriter(open_stats_storage(), AttemptLog(), worker=get_io_worker())
+    return _stats_writer
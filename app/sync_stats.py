@@ -0,0 +1,76 @@
+# sync_stats.py
+#
+# Synchronizace statistik mezi zařízeními přes sdílenou složku (flash disk, síťový disk).
+# Použití: python app/sync_stats.py SDILENA_SLOZKA [--stats stats.json] [--no-export]
+#          python app/sync_stats.py SLOZKA_TRIDY --out trida.json --no-local --no-export
+#
+# Každé zařízení exportuje svůj stats.json jako SLOZKA/stats-<zařízení>.json a
+# sloučí do sebe všechny exporty ve složce. Sloučení je deterministické a
+# idempotentní (viz merge_stats_documents), takže na pořadí ani opakování nezáleží.
+
+import argparse
+import json
+import os
+import sys
+
+from data import (
+    STATS_FILE,
+    STATS_LOCK_TIMEOUT,
+    atomic_write_json,
+    device_id,
+    flatten_stats,
+    load_stats_document,
+    merge_stats_documents,
+    stats_document,
+)
+from filelock import FileLock
+
+def iter_stats_files(directory):
+    """Cesty k exportům statistik ve složce (seřazené, kvůli stabilnímu výpisu)."""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json") and not name.endswith(".tmp"):
+            yield os.path.join(directory, name)
+
+def merge_stats_files(paths, doc=None):
+    """Sloučí soubory jeden po druhém; v paměti je vždy jen výsledek a jeden soubor."""
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                other = stats_document(json.load(f))
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            print(f"Přeskakuji {path}: {e}", file=sys.stderr)
+            continue
+        doc = other if doc is None else merge_stats_documents(doc, other)
+    return doc
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sloučí statistiky z exportů ve sdílené složce.")
+    parser.add_argument("directory")
+    parser.add_argument("--stats", default=STATS_FILE, help="lokální stats.json")
+    parser.add_argument("--out", help="výsledek zapsat sem místo do lokálního stats.json")
+    parser.add_argument("--no-local", action="store_true", help="nezahrnovat lokální stats.json")
+    parser.add_argument("--no-export", action="store_true", help="nezapisovat export tohoto zařízení do složky")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Složka {args.directory} neexistuje.", file=sys.stderr)
+        return 1
+    export = os.path.join(args.directory, f"stats-{device_id()}.json")
+    target = args.out or args.stats
+    # Zámek lokálního souboru, aby se sync nepřekrýval se zápisem běžící aplikace
+    with FileLock(args.stats + ".lock", timeout=STATS_LOCK_TIMEOUT * 5):
+        doc = None if args.no_local else load_stats_document(args.stats)
+        doc = merge_stats_files(iter_stats_files(args.directory), doc)
+        if doc is None:
+            print("Není co slučovat.", file=sys.stderr)
+            return 1
+        atomic_write_json(doc, target)
+    if not args.no_export:
+        atomic_write_json(doc, export)
+    stats = flatten_stats(doc)
+    answered = sum(s["total"] for s in stats.values() if isinstance(s, dict))
+    print(f"Sloučeno: {len(doc['counters'])} uzlů, {answered} odpovědí -> {target}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
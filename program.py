@@ -3,6 +3,7 @@ from tkinter import messagebox
 import random
 import json
 import os
+import sys
 import string
 from tkinter import ttk  # na Treeview
 
@@ -35,15 +36,18 @@ if not ALL_QUESTIONS:
 
 STATS_FILE = "stats.json"
 
-def load_stats(filename):
-    if os.path.exists(filename):
-        with open(filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+# Statistiky sdílí formát i zamykání s app/, takže program.py a main.py mohou
+# běžet současně, aniž by si navzájem přepisovaly čítače
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+from storage import JsonStatsStorage
 
-def save_stats(filename, stats):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(stats, f, indent=2, ensure_ascii=False)
+stats_storage = JsonStatsStorage(STATS_FILE)
+
+def load_stats():
+    return {qid: stat for qid, stat in stats_storage.load().items() if isinstance(stat, dict)}
+
+def record_answer(question_id, correct):
+    stats_storage.commit({str(question_id): (1, int(correct), int(not correct))}, {}, [])
 
 # -- SESSION SAVE/LOAD
 def save_session(data):
@@ -64,7 +68,7 @@ def clear_session():
 # ---- Statistiky ----
 
 def show_stats_window():
-    stats = load_stats(STATS_FILE)
+    stats = load_stats()
     stats_win = tk.Toplevel(root)
     stats_win.title("Statistiky otázek")
     stats_win.geometry("980x600")
@@ -148,7 +152,7 @@ def show_stats_window():
     btns.pack(anchor="center", pady=7)
     def reset_stats():
         if messagebox.askyesno("Potvrdit reset", "Opravdu chceš vymazat všechny statistiky?"):
-            save_stats(STATS_FILE, {})
+            stats_storage.replace({})
             stats_win.destroy()
             show_stats_window()
     btn_reset = tk.Button(btns, text="Resetovat statistiky", font=("Arial", 11), command=reset_stats)
@@ -225,7 +229,6 @@ def show_stats_window():
 
 class QuizApp:
     def __init__(self, master, questions, view_mode=False, show_main_menu=None, resume_data=None):
-        self.stats = load_stats(STATS_FILE)
         self.master = master
         self.master.title("Quiz")
         self.master.geometry("1080x820")
@@ -399,11 +402,6 @@ class QuizApp:
             return
         q = self.question_list[self.question_index]
         question_id = q.get("id")
-        if question_id is not None:
-            str_id = str(question_id)
-            if str_id not in self.stats:
-                self.stats[str_id] = {"total": 0, "correct": 0, "wrong": 0}
-            self.stats[str_id]["total"] += 1
 
         user_selected_new = {k for k, v in self.vars.items() if v.get()}
         user_set = {self.current_option_mapping[k] for k in user_selected_new}
@@ -445,16 +443,13 @@ class QuizApp:
         if correct:
             self.feedback_label.config(text="Správně!", fg="green")
             self.score += 1
-            if question_id is not None:
-                self.stats[str_id]["correct"] += 1
         else:
             self.feedback_label.config(text="Špatně!", fg="red")
             if q not in self.wrong_questions:
                 self.wrong_questions.append(q)
-            if question_id is not None:
-                self.stats[str_id]["wrong"] += 1
 
-        save_stats(STATS_FILE, self.stats)
+        if question_id is not None:
+            record_answer(question_id, correct)
         if q.get("explanation"):
             explanation_label = tk.Label(
                 self.options_frame,
@@ -608,3 +603,4 @@ def show_main_menu():
 root = tk.Tk()
 show_main_menu()
 root.mainloop()
+stats_storage.close()
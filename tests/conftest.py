@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Moduly aplikace se importují přímo (stejně jako při spuštění z app/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# ID zařízení se nesmí zapisovat do domovské složky toho, kdo testy spouští
+os.environ.setdefault("QUIZ_DEVICE_ID_FILE", os.path.join(tempfile.mkdtemp(), ".quiz_device_id"))
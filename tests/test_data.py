@@ -0,0 +1,66 @@
+import io
+import json
+import os
+
+import pytest
+
+from data import _iter_json_array, load_cached
+
+def _items(text, chunk_size):
+    return list(_iter_json_array(io.StringIO(text), chunk_size))
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_streaming_parser_matches_json_loads(chunk_size):
+    text = json.dumps([1, 23456, -1.5e3, "řetězec, s čárkou", {"a": [1, 2]}, [], True, None], ensure_ascii=False)
+    assert _items(text, chunk_size) == json.loads(text)
+
+def test_number_cut_at_chunk_boundary_is_not_split():
+    assert _items("[1, 23456]", 3) == [1, 23456]
+
+def test_empty_array():
+    assert _items(" [ ] ", 2) == []
+
+@pytest.mark.parametrize("text", ["[1,,2]", "[1 2]", "[,1]", "[1,]", "[1", "{}"])
+def test_malformed_arrays_are_rejected(text):
+    with pytest.raises(ValueError):
+        _items(text, 2)
+
+def _cached(path, builds, value="A"):
+    def build():
+        builds.append(value)
+        return value
+    return load_cached(str(path), ".cache", build)
+
+def test_cache_is_reused_while_the_bank_is_unchanged(tmp_path):
+    bank = tmp_path / "bank.json"
+    bank.write_text("[1]", encoding="utf-8")
+    builds = []
+    assert _cached(bank, builds) == "A"
+    assert _cached(bank, builds, "B") == "A"
+    assert builds == ["A"]
+
+def test_touch_keeps_the_cache_but_a_content_change_rebuilds_it(tmp_path):
+    bank = tmp_path / "bank.json"
+    bank.write_text("[1]", encoding="utf-8")
+    builds = []
+    _cached(bank, builds)
+    st = os.stat(bank)
+    os.utime(bank, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    # Jiné mtime, stejný obsah: rozhodne SHA-256
+    assert _cached(bank, builds, "B") == "A"
+    bank.write_text("[2]", encoding="utf-8")
+    os.utime(bank, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    # Stejná velikost, jiné mtime i obsah
+    assert _cached(bank, builds, "C") == "C"
+    assert builds == ["A", "C"]
+
+def test_size_change_and_corrupt_cache_rebuild(tmp_path):
+    bank = tmp_path / "bank.json"
+    bank.write_text("[1]", encoding="utf-8")
+    builds = []
+    _cached(bank, builds)
+    bank.write_text("[1, 2]", encoding="utf-8")
+    assert _cached(bank, builds, "B") == "B"
+    (tmp_path / "bank.json.cache").write_bytes(b"not a pickle")
+    assert _cached(bank, builds, "C") == "C"
+    assert builds == ["A", "B", "C"]
@@ -0,0 +1,40 @@
+import json
+
+import dedupe
+from generate_bank import write_bank
+
+TEXT = "Jak se zaúčtuje vznik pohledávky za odběratelem při prodeji zboží na fakturu"
+
+def _q(qid, text, answer):
+    return {"id": qid, "type": "single", "question": text,
+            "options": {"a": "311/601", "b": "321/601", "c": "311/604"}, "answer": [answer]}
+
+def test_near_duplicates_with_different_answers_are_only_reported(tmp_path):
+    bank = tmp_path / "bank.json"
+    write_bank([_q(1, TEXT, "a"), _q(2, TEXT, "a"), _q(3, TEXT, "b")], str(bank))
+    remap_out = tmp_path / "remap.json"
+    dedup_out = tmp_path / "dedup.json"
+    dedupe.main([str(bank), "--report", str(tmp_path / "report.json"),
+                 "--remap-out", str(remap_out), "--dedup-out", str(dedup_out)])
+    assert json.loads(remap_out.read_text(encoding="utf-8")) == {"2": 1}
+    assert [q["id"] for q in json.loads(dedup_out.read_text(encoding="utf-8"))] == [1, 3]
+
+def test_merge_conflicting_flag_merges_everything():
+    clusters = [{"keep": 1, "members": [{"id": 2, "similarity": 1.0, "answers_differ": False},
+                                        {"id": 3, "similarity": 1.0, "answers_differ": True}]}]
+    assert dedupe.build_remap(clusters) == {"2": 1}
+    assert dedupe.build_remap(clusters, merge_conflicting=True) == {"2": 1, "3": 1}
+
+def _opts(*texts):
+    return tuple(" ".join(dedupe.tokenize(t)) for t in texts)
+
+def test_reworded_correct_option_is_not_a_conflict():
+    keep = (_opts("Má dáti 311, Dal 604", "Má dáti 321, Dal 604", "Má dáti 311, Dal 601"), 0b001)
+    member = (_opts("MD 311 / D 601", "MD 311 / D 604", "MD 321 / D 604"), 0b010)
+    assert not dedupe.answers_differ(keep, member)
+    assert dedupe.answers_differ(keep, (member[0], 0b001))
+
+def test_case_diacritics_and_order_do_not_matter():
+    keep = (_opts("Ano", "Ne"), 0b01)
+    assert not dedupe.answers_differ(keep, (_opts("ne", "ANO "), 0b10))
+    assert dedupe.answers_differ(keep, (_opts("ne", "ANO "), 0b01))
@@ -0,0 +1,29 @@
+import threading
+
+from io_worker import IOWorker
+
+def test_tasks_run_in_order_and_keyed_tasks_coalesce():
+    worker = IOWorker()
+    gate = threading.Event()
+    done = []
+    worker.submit(gate.wait)
+    worker.submit(done.append, "a")
+    for n in range(5):
+        worker.submit(done.append, f"session-{n}", key="session")
+    worker.submit(done.append, "b")
+    gate.set()
+    worker.flush()
+    # Z nezačatých úloh se stejným klíčem proběhne jen poslední, na jejím místě ve frontě
+    assert done == ["a", "session-4", "b"]
+    worker.close()
+
+def test_call_waits_for_earlier_tasks_and_errors_reach_the_caller():
+    worker = IOWorker()
+    done = []
+    worker.submit(done.append, 1)
+    assert worker.call(lambda: list(done)) == [1]
+    errors = []
+    worker.submit(lambda: 1 / 0, error=errors.append)
+    worker.flush()
+    assert isinstance(errors[0], ZeroDivisionError)
+    worker.close()
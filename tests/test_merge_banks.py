@@ -0,0 +1,62 @@
+import json
+
+import merge_banks
+from generate_bank import generate_questions, write_bank
+
+def _write(path, questions):
+    write_bank(questions, str(path))
+    return str(path)
+
+def test_merge_renumbers_colliding_ids(tmp_path):
+    a = _write(tmp_path / "a.json", generate_questions(10, seed=1))
+    b = _write(tmp_path / "b.jsonl", generate_questions(10, seed=2))
+    out = tmp_path / "out.json"
+    assert merge_banks.main([a, b, "--out", str(out), "--mapping", str(tmp_path / "map.json")]) == 0
+    merged = json.loads(out.read_text(encoding="utf-8"))
+    ids = [q["id"] for q in merged]
+    assert len(merged) == 20 and len(set(ids)) == 20
+    mapping = json.loads((tmp_path / "map.json").read_text(encoding="utf-8"))
+    assert mapping[a] == {} and len(mapping[b]) == 10
+
+def test_output_that_is_an_input_is_rejected(tmp_path):
+    live = _write(tmp_path / "live.json", generate_questions(5, seed=1))
+    new = _write(tmp_path / "new.json", generate_questions(5, seed=2))
+    before = (tmp_path / "live.json").read_bytes()
+    assert merge_banks.main([live, new, "--out", live]) == 1
+    assert (tmp_path / "live.json").read_bytes() == before
+
+def test_conflict_error_leaves_existing_output_untouched(tmp_path):
+    first = list(generate_questions(5, seed=1))
+    second = [dict(q) for q in first]
+    keys = list(second[2]["options"])
+    second[2]["answer"] = [k for k in keys if k not in first[2]["answer"]][:1]
+    a = _write(tmp_path / "a.json", first)
+    b = _write(tmp_path / "b.json", second)
+    out = tmp_path / "out.json"
+    out.write_text("[]", encoding="utf-8")
+    assert merge_banks.main([a, b, "--out", str(out), "--on-conflict", "error"]) == 1
+    assert out.read_text(encoding="utf-8") == "[]"
+    assert not list(tmp_path.glob("*.tmp*"))
+
+def test_parse_errors_are_not_reported_as_conflicts(tmp_path):
+    a = _write(tmp_path / "a.json", generate_questions(3, seed=1))
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"id": 1', encoding="utf-8")
+    try:
+        merge_banks.main([a, str(broken), "--out", str(tmp_path / "out.json")])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("chyba parseru se má propagovat")
+    assert not (tmp_path / "out.json").exists()
+
+def test_stats_from_matches_sources_by_real_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write(tmp_path / "a.json", generate_questions(5, seed=1))
+    _write(tmp_path / "b.json", generate_questions(5, seed=2))
+    (tmp_path / "stats.json").write_text(json.dumps({"1": {"total": 3, "correct": 1, "wrong": 2}}), encoding="utf-8")
+    args = ["a.json", "b.json", "--out", "out.json", "--stats", "stats.json", "--stats-out", "s.json"]
+    assert merge_banks.main(args + ["--stats-from", "./b.json"]) == 0
+    remapped = json.loads((tmp_path / "s.json").read_text(encoding="utf-8"))
+    assert "1" not in remapped and remapped
+    assert merge_banks.main(args + ["--stats-from", "c.json"]) == 1
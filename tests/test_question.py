@@ -0,0 +1,37 @@
+import pickle
+
+import pytest
+
+from question import Question
+
+RAW = {
+    "id": 12,
+    "type": "practical",
+    "question": "Které účty patří mezi finanční?",
+    "options": {"a": "211 Pokladna", "b": "221 Bankovní účty", "c": "311 Odběratelé"},
+    "answer": ["b", "a"],
+    "explanation": "Účtová třída 2.",
+    "tags": ["ucty"],
+    "source": "skripta",
+}
+
+def test_json_round_trip_keeps_everything_but_answer_order():
+    q = Question.from_json(RAW)
+    assert q.answer_mask == 0b011
+    assert q.answer == ("a", "b")
+    assert q.to_json() == dict(RAW, answer=["a", "b"])
+
+def test_option_keys_are_shared_and_masks_come_from_keys():
+    a = Question.from_json(RAW)
+    b = Question.from_json(dict(RAW, id=13, answer=["c"]))
+    assert a.option_keys is b.option_keys
+    assert b.answer_mask == 0b100
+    assert a.keys_mask({"a", "b"}) == a.answer_mask
+
+def test_questions_are_immutable_but_can_be_copied_and_pickled():
+    q = Question.from_json(RAW)
+    with pytest.raises(AttributeError):
+        q.id = 1
+    renumbered = q.replace(id=99)
+    assert renumbered.id == 99 and q.id == 12
+    assert pickle.loads(pickle.dumps(q)).to_json() == q.to_json()
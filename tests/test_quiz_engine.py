@@ -0,0 +1,53 @@
+from data import append_session_event, load_session, load_session_events, save_session
+from question import Question
+from quiz_engine import QuizEngine, replay_session
+
+def _questions(n):
+    return [Question(i, "single", f"Otázka {i}", ("a", "b"), ("ano", "ne"), 1) for i in range(1, n + 1)]
+
+def _play(engine, answers, log):
+    """Odehraje odpovědi jako QuizApp a zapisuje stejné události do log."""
+    for correct in answers:
+        mask = engine.current.answer_mask if correct else 0
+        log("answered", correct=engine.answer(mask))
+        step = engine.advance()
+        if step == "finished":
+            return
+        log("advanced" if step == "next" else "round_started")
+
+def test_journal_replay_restores_the_engine_state(tmp_path):
+    session_file = str(tmp_path / "session.json")
+    journal = str(tmp_path / "session.journal")
+    engine = QuizEngine(_questions(4), seed=7)
+    snapshot = dict(engine.session_data(), generation="g1")
+    save_session(snapshot, session_file, journal)
+    # Událost ze starší generace se nesmí započítat
+    append_session_event({"e": "answered", "g": "g0", "correct": True}, journal)
+
+    def log(kind, **fields):
+        append_session_event({"e": kind, "g": "g1", "t": engine.elapsed_seconds, **fields}, journal)
+    _play(engine, [True, False, True, False, False], log)
+
+    replayed = replay_session(load_session(session_file), load_session_events(journal))
+    replayed.pop("generation")
+    assert replayed == engine.session_data()
+    assert replayed["kolo"] == 2 and replayed["mode"] == "repeat_wrong"
+
+def test_truncated_last_journal_line_is_ignored(tmp_path):
+    journal = tmp_path / "session.journal"
+    append_session_event({"e": "advanced", "g": "g"}, str(journal))
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"e": "answ')
+    assert load_session_events(str(journal)) == [{"e": "advanced", "g": "g"}]
+
+def test_replaying_a_long_wrong_round_records_each_question_once():
+    ids = list(range(20000))
+    data = {"generation": "g", "question_ids": ids, "wrong_ids": [], "question_index": 0,
+            "score": 0, "kolo": 1, "mode": "first_run"}
+    miss = {"e": "answered", "g": "g", "correct": False}
+    events = [miss, {"e": "advanced", "g": "g"}] * (len(ids) - 1)
+    # Poslední otázka je ve žurnálu dvakrát (odpověď zopakovaná po pádu) a nesmí se zdvojit
+    events += [miss, miss, {"e": "round_started", "g": "g"}]
+    replayed = replay_session(data, events)
+    assert replayed["question_ids"] == ids and replayed["wrong_ids"] == []
+    assert replayed["kolo"] == 2
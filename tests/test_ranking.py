@@ -0,0 +1,24 @@
+import random
+
+from ranking import WorstQuestions, wilson_lower_bound
+
+def test_single_miss_ranks_below_many_misses():
+    assert wilson_lower_bound(1, 1) < wilson_lower_bound(40, 40)
+    ranking = WorstQuestions({
+        "1": {"total": 1, "correct": 0, "wrong": 1},
+        "2": {"total": 40, "correct": 0, "wrong": 40},
+    })
+    assert [qid for qid, *_ in ranking.top()] == ["2", "1"]
+
+def test_incremental_updates_match_a_fresh_build():
+    rng = random.Random(5)
+    ranking = WorstQuestions()
+    stats = {}
+    for _ in range(500):
+        qid = str(rng.randrange(30))
+        correct = rng.random() < 0.6
+        ranking.update(qid, correct)
+        stat = stats.setdefault(qid, {"total": 0, "correct": 0, "wrong": 0})
+        stat["total"] += 1
+        stat["correct" if correct else "wrong"] += 1
+    assert ranking.top(30) == WorstQuestions(stats).top(30)
@@ -0,0 +1,45 @@
+import random
+from collections import Counter
+
+import pytest
+
+from question import Question
+from sampling import DAY, RECENCY_WEIGHT, AliasTable, WeightedSampler, weak_spot_weights
+
+def test_alias_table_draws_in_proportion_to_weights():
+    weights = [1, 2, 3, 4, 0]
+    table = AliasTable(weights)
+    rng = random.Random(1)
+    n = 100000
+    counts = Counter(table.draw(rng) for _ in range(n))
+    assert counts[4] == 0
+    for i, w in enumerate(weights[:4]):
+        assert counts[i] / n == pytest.approx(w / 10, abs=0.01)
+
+def test_alias_table_with_zero_weights_is_uniform():
+    table = AliasTable([0, 0])
+    assert table.prob == [1.0, 1.0]
+
+def test_sampler_returns_distinct_items_for_small_and_large_k():
+    sampler = WeightedSampler(list("abcdefgh"), [1, 1, 1, 1, 5, 5, 5, 5])
+    rng = random.Random(2)
+    for k in (1, 3, 6, 8, 20):
+        chosen = sampler.sample(k, rng)
+        assert len(chosen) == min(k, 8) == len(set(chosen))
+
+def test_sampler_prefers_heavy_items():
+    sampler = WeightedSampler(["lehká", "těžká"] + ["x"] * 8, [1, 50] + [1] * 8)
+    rng = random.Random(3)
+    hits = sum("těžká" in sampler.sample(2, rng) for _ in range(2000))
+    assert hits > 1800
+
+def test_weak_spot_weights_favour_errors_and_old_questions():
+    questions = [Question(i, "single", "", ("a",), ("x",), 1) for i in range(1, 4)]
+    stats = {"1": {"total": 10, "correct": 1, "wrong": 9}, "2": {"total": 10, "correct": 9, "wrong": 1}}
+    now = 100 * DAY
+    fresh, good, unseen = weak_spot_weights(questions, stats, {"1": now, "2": now}, now)
+    assert fresh > good
+    # Neviděná otázka: chybovost 1/2 a plný bonus za nedávnost
+    assert unseen == pytest.approx(0.5 * (1 + RECENCY_WEIGHT))
+    stale = weak_spot_weights(questions[:1], stats, {"1": 0}, now)[0]
+    assert stale > fresh
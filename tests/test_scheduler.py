@@ -0,0 +1,46 @@
+from question import Question
+from scheduler import DAY, LEARN_AHEAD_SECONDS, RELEARN_SECONDS, SpacedScheduler, new_state, review_state
+
+def _questions(n):
+    return [Question(i, "single", f"Otázka {i}", ("a", "b"), ("ano", "ne"), 1) for i in range(1, n + 1)]
+
+def _serve(scheduler, now, answers):
+    order = []
+    for correct in answers:
+        q = scheduler.next_question(now)
+        if q is None:
+            break
+        order.append(q.id)
+        scheduler.review(q.id, correct, now)
+    return order
+
+def test_sm2_intervals_grow_and_a_miss_resets_them():
+    state = new_state()
+    state = review_state(state, True, 0)
+    assert state[1:] == [1, 1, DAY]
+    state = review_state(state, True, 0)
+    assert state[1] == 6
+    state = review_state(state, True, 0)
+    assert state[1] == 15
+    state = review_state(state, False, 100)
+    assert state == [2.5 - 0.32, 0, 0, 100 + RELEARN_SECONDS]
+
+def test_missed_question_is_not_served_again_immediately():
+    scheduler = SpacedScheduler(_questions(3), {})
+    assert _serve(scheduler, 0, [False, True, True, True]) == [1, 2, 3, 1]
+
+def test_learn_ahead_only_when_nothing_else_is_left():
+    states = {"1": [2.5, 1, 1, LEARN_AHEAD_SECONDS // 2], "2": [2.5, 1, 1, 10 * DAY]}
+    scheduler = SpacedScheduler(_questions(3), states)
+    assert _serve(scheduler, 0, [True, True, True]) == [3, 1]
+
+def test_due_count_is_kept_up_to_date_by_reviews():
+    states = {"1": [2.5, 1, 1, 0.0], "2": [2.5, 1, 1, 10 * DAY]}
+    scheduler = SpacedScheduler(_questions(3), states, new_limit=1)
+    assert scheduler.due_count(0) == 2
+    scheduler.review(1, True, 0)
+    assert scheduler.due_count(0) == 1
+    scheduler.review(3, False, 0)
+    assert scheduler.due_count(0) == 1
+    scheduler.review(3, True, 0)
+    assert scheduler.due_count(0) == 0
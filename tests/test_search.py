@@ -0,0 +1,29 @@
+from question import Question
+from search import SearchIndex, normalize
+
+def _q(qid, text, options=("ano", "ne"), explanation=None):
+    return Question(qid, "theoretical", text, ("a", "b"), options, 1, explanation)
+
+QUESTIONS = [
+    _q(1, "Účetní závěrka obsahuje rozvahu"),
+    _q(2, "Výkaz zisku a ztráty", explanation="Sestavuje se k rozvahovému dni"),
+    _q(3, "Cash flow přímou metodou", options=("Pokladna", "Závazky")),
+]
+
+def test_normalize_strips_diacritics_and_case():
+    assert normalize("Účetnictví ŽLUŤOUČKÉ") == "ucetnictvi zlutoucke"
+
+def test_search_ignores_diacritics_and_covers_options_and_explanations():
+    index = SearchIndex(QUESTIONS)
+    assert index.search("UCETNI zaverka") == [0]
+    assert index.search("zavazky") == [2]
+    assert index.search("rozvahovemu") == [1]
+
+def test_last_word_is_a_prefix_and_other_words_must_match_whole():
+    index = SearchIndex(QUESTIONS)
+    assert index.search("rozvah") == [0, 1]
+    assert index.search("zaverka rozvah") == [0]
+    assert index.search("zaver rozvahu") == []
+
+def test_empty_query_returns_none():
+    assert SearchIndex(QUESTIONS).search("  ,. ") is None
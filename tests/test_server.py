@@ -0,0 +1,77 @@
+import asyncio
+
+from generate_bank import generate_questions, write_bank
+from data import load_questions_from_json
+from question_bank import QuestionBank
+from server import QuizServer, ServerDB
+
+def _run(tmp_path, scenario):
+    bank_file = tmp_path / "bank.json"
+    write_bank(generate_questions(5, seed=1), str(bank_file))
+    bank = QuestionBank(load_questions_from_json(str(bank_file), use_cache=False))
+
+    async def main():
+        db = ServerDB(str(tmp_path / "server.sqlite3"))
+        db.start()
+        try:
+            return await scenario(QuizServer(bank, db))
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+def test_invalid_answer_does_not_block_the_question(tmp_path):
+    async def scenario(server):
+        status, payload = await server._dispatch("POST", "/api/start?user=eva", b"")
+        assert status == 200
+        qid = payload["question"]["id"]
+        body = b'{"id": %d, "answers": ["a"], "duration": "abc"}' % qid
+        status, _ = await server._dispatch("POST", "/api/answer?user=eva", body)
+        assert status == 400
+        status, payload = await server._dispatch("POST", "/api/answer?user=eva", body.replace(b'"abc"', b"1.5"))
+        assert status == 200 and "correct" in payload
+        status, _ = await server._dispatch("POST", "/api/answer?user=eva", body.replace(b'"abc"', b"1.5"))
+        assert status == 409
+    _run(tmp_path, scenario)
+
+def test_unexpected_errors_return_500(tmp_path, capsys):
+    async def scenario(server):
+        async def broken(self, params):
+            raise RuntimeError("chyba")
+        server.ROUTES = {("GET", "/api/stats"): broken}
+        return await server._dispatch("GET", "/api/stats?user=eva", b"")
+    assert _run(tmp_path, scenario)[0] == 500
+    assert "RuntimeError" in capsys.readouterr().err
+
+def test_bad_content_length_gets_a_response(tmp_path):
+    async def scenario(server):
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /api/start?user=eva HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        await writer.drain()
+        status_line = await reader.readline()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return status_line
+    assert _run(tmp_path, scenario).startswith(b"HTTP/1.1 400")
+
+def test_next_requires_an_answer(tmp_path):
+    async def scenario(server):
+        await server._dispatch("POST", "/api/start?user=eva", b"")
+        status, _ = await server._dispatch("POST", "/api/next?user=eva", b"")
+        assert status == 409
+        await server._dispatch("POST", "/api/answer?user=eva", b'{"answers": []}')
+        status, payload = await server._dispatch("POST", "/api/next?user=eva", b"")
+        assert status == 200 and payload["step"] == "next"
+    _run(tmp_path, scenario)
+
+def test_question_id_from_query_string(tmp_path):
+    async def scenario(server):
+        status, payload = await server._dispatch("POST", "/api/start?user=eva", b"")
+        qid = payload["question"]["id"]
+        status, _ = await server._dispatch("POST", "/api/answer?user=eva&id=abc", b'{"answers": []}')
+        assert status == 400
+        status, _ = await server._dispatch("POST", f"/api/answer?user=eva&id={qid}", b'{"answers": []}')
+        assert status == 200
+    _run(tmp_path, scenario)
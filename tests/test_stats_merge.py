@@ -0,0 +1,83 @@
+import data
+import storage
+from data import flatten_stats, load_stats_document, merge_stats_documents, stats_document
+
+def _storage(tmp_path, monkeypatch, device, name="stats.json"):
+    monkeypatch.setattr(storage, "device_id", lambda: device)
+    monkeypatch.setattr(data, "device_id", lambda: device)
+    return storage.JsonStatsStorage(str(tmp_path / name), lock_timeout=1)
+
+def _doc(tmp_path, monkeypatch, device, deltas, reset=False):
+    s = _storage(tmp_path, monkeypatch, device, f"{device}.json")
+    if reset:
+        s.replace({})
+    s.commit(deltas, {}, [])
+    s.close()
+    return load_stats_document(s.filename)
+
+def _merge_all(docs):
+    merged = docs[0]
+    for doc in docs[1:]:
+        merged = merge_stats_documents(merged, doc)
+    return merged
+
+def test_two_instances_on_one_device_do_not_overwrite_each_other(tmp_path, monkeypatch):
+    a = _storage(tmp_path, monkeypatch, "dev")
+    b = _storage(tmp_path, monkeypatch, "dev")
+    a.commit({"1": [1, 1, 0]}, {}, [])
+    b.commit({"1": [1, 0, 1]}, {}, [])
+    a.commit({"2": [1, 1, 0]}, {}, [])
+    stats = flatten_stats(load_stats_document(a.filename))
+    assert stats["1"] == {"total": 2, "correct": 1, "wrong": 1}
+    assert stats["2"] == {"total": 1, "correct": 1, "wrong": 0}
+    a.close()
+    b.close()
+
+def test_merge_across_devices_keeps_every_students_counters(tmp_path, monkeypatch):
+    legacy = stats_document({"1": {"total": 2, "correct": 1, "wrong": 1}})
+    first = _doc(tmp_path, monkeypatch, "aaa", {"2": [1, 1, 0]}, reset=True)
+    second = _doc(tmp_path, monkeypatch, "bbb", {"3": [3, 0, 3]}, reset=True)
+    stats = flatten_stats(_merge_all([legacy, first, second]))
+    assert stats["1"]["total"] == 2
+    assert stats["2"]["total"] == 1
+    assert stats["3"]["total"] == 3
+    # Nezávisí na pořadí a opakované sloučení nic nezmění
+    assert _merge_all([second, legacy, first]) == _merge_all([legacy, first, second])
+    merged = _merge_all([legacy, first, second])
+    assert merge_stats_documents(merged, first) == merged
+
+def test_reset_only_drops_the_resetting_devices_nodes(tmp_path, monkeypatch):
+    a = _storage(tmp_path, monkeypatch, "aaa")
+    a.commit({"1": [5, 5, 0]}, {}, [])
+    before_reset = load_stats_document(a.filename)
+    other = _doc(tmp_path, monkeypatch, "bbb", {"2": [4, 0, 4]})
+    monkeypatch.setattr(storage, "device_id", lambda: "aaa")
+    a.replace({})
+    a.commit({"3": [1, 1, 0]}, {}, [])
+    a.close()
+    after_reset = load_stats_document(a.filename)
+    stats = flatten_stats(_merge_all([before_reset, other, after_reset]))
+    assert "1" not in stats
+    assert stats["2"]["total"] == 4
+    assert stats["3"]["total"] == 1
+
+def test_copies_of_one_flat_file_are_not_counted_twice(tmp_path, monkeypatch):
+    flat = {"1": {"total": 10, "correct": 7, "wrong": 3}}
+    docs = []
+    for device in ("aaa", "bbb"):
+        s = _storage(tmp_path, monkeypatch, device, f"{device}.json")
+        data.atomic_write_json(flat, s.filename)
+        s.commit({"2": [1, 1, 0]}, {}, [])
+        s.close()
+        docs.append(load_stats_document(s.filename))
+    stats = flatten_stats(_merge_all(docs + [stats_document({"1": {"total": 4, "correct": 4, "wrong": 0}})]))
+    assert stats["1"] == {"total": 14, "correct": 11, "wrong": 3}
+    assert stats["2"]["total"] == 2
+
+def test_reset_drops_imported_legacy_counters(tmp_path, monkeypatch):
+    s = _storage(tmp_path, monkeypatch, "aaa")
+    data.atomic_write_json({"1": {"total": 10, "correct": 7, "wrong": 3}}, s.filename)
+    copy = load_stats_document(s.filename)
+    s.replace({})
+    s.close()
+    assert "1" not in flatten_stats(merge_stats_documents(load_stats_document(s.filename), copy))
@@ -0,0 +1,22 @@
+from history import AttemptLog
+from io_worker import IOWorker
+from storage import JsonStatsStorage, StatsWriter
+
+def _writer(tmp_path):
+    storage = JsonStatsStorage(str(tmp_path / "stats.json"), schedule_filename=str(tmp_path / "schedule.json"))
+    return StatsWriter(storage, AttemptLog(str(tmp_path / "attempts.bin")), worker=IOWorker())
+
+def test_weak_spot_data_and_schedule_are_delivered_by_callback(tmp_path):
+    writer = _writer(tmp_path)
+    writer.record_answer(7, False)
+    writer.record_review(7, [2.5, 0, 0, 123.0])
+    results = []
+    writer.request_weak_spot_data(lambda stats, last_seen: results.append((stats, last_seen)), 30)
+    writer.request_schedule(results.append)
+    writer.worker.flush()
+    (stats, last_seen), schedule = results
+    assert stats["7"] == {"total": 1, "correct": 0, "wrong": 1}
+    assert set(last_seen) == {"7"}
+    assert schedule == {"7": [2.5, 0, 0, 123.0]}
+    writer.close()
+    writer.worker.close()